@@ -0,0 +1,156 @@
+"""
+BENCHMARK AF HTML-PARSERE
+Sammenligner html.parser (reference) med de hurtigere parsere (lxml og, for
+ranking-siderne, den strømmende udtrækker uden DOM) på ranking-, startliste- og
+kalendersider, og tjekker at de giver PRÆCIS de samme rækker. Ud over tid måles
+det største hukommelsesforbrug (tracemalloc) for én gennemgang.
+
+    python bench_parsers.py                    # opdigtede sider (ingen netværk)
+    python bench_parsers.py --pages sider/     # gemte sider, se filnavne nedenfor
+    python bench_parsers.py --record sider/    # hent og gem dagens sider først
+
+Filnavne i --pages: ranking*.html, startlist*.html, calendar*.html, race*.html.
+Afslutter med exit-kode 1 hvis en parser giver andre rækker end referencen.
+"""
+
+import os
+import sys
+import glob
+import time
+import argparse
+import tracemalloc
+from datetime import datetime
+
+from html_parsing import REFERENCE_PARSER, STREAM_PARSER, available_parsers
+
+KINDS = ("ranking", "startlist", "calendar", "race")
+
+
+def _parsers_by_kind():
+    # Importeres her, så --help ikke kræver alle afhængigheder
+    from update_automatic_cloudscraper import _parse_ranking_page
+    from scrape_tdf_startlist import parse_startlist
+    from scrape_upcoming_races import parse_calendar, parse_race_riders
+
+    today = datetime.now()
+    return {
+        "ranking": _parse_ranking_page,
+        "startlist": parse_startlist,
+        "calendar": lambda html, parser: parse_calendar(html, today, parser),
+        "race": parse_race_riders,
+    }
+
+
+def synthetic_pages():
+    """Sider der ligner de rigtige nok til at måle forskellen mellem parserne."""
+    from fake_flaresolverr import ranking_page, startlist_page
+
+    today = datetime.now()
+    day_rows = []
+    for i in range(7):
+        d = today.day + i
+        races = "".join(
+            f'<a href="/loeb/{i}-{j}">Løb {i}-{j} - {j + 1}. etape</a> '
+            f'<span>{j} danskere til start i Løb {i}-{j}</span><br>'
+            for j in range(6)
+        )
+        day_rows.append(f"<tr><td>d. {d}/{today.month}</td><td>{races}</td></tr>")
+    calendar = f"<html><body><table>{''.join(day_rows)}</table></body></html>"
+    race = "<html><body><table>" + "".join(
+        f'<tr><td><img src="/flags/{"dk" if i % 3 == 0 else "be"}.png"></td>'
+        f'<td><a href="/rytter/{i}">Rytter Nummer{i}</a></td><td>Team {i}</td></tr>'
+        for i in range(150)
+    ) + "</table></body></html>"
+    return {
+        "ranking": [ranking_page(off, 1500) for off in range(0, 1500, 100)],
+        "startlist": [startlist_page(184)],
+        "calendar": [calendar],
+        "race": [race],
+    }
+
+
+def load_pages(directory):
+    pages = {}
+    for kind in KINDS:
+        for path in sorted(glob.glob(os.path.join(directory, f"{kind}*.html"))):
+            with open(path, encoding="utf-8") as f:
+                pages.setdefault(kind, []).append(f.read())
+    return pages
+
+
+def record_pages(directory):
+    """Hent dagens sider via scraper_utils.fetch og gem dem til senere benchmarks."""
+    from scraper_utils import fetch
+    from update_automatic_cloudscraper import RANKING_URL
+
+    os.makedirs(directory, exist_ok=True)
+    today = datetime.now()
+    urls = [(f"ranking{i:02d}", RANKING_URL.format(date=today.strftime('%Y-%m-%d'), offset=i * 100))
+            for i in range(5)]
+    urls.append(("startlist", f"https://www.procyclingstats.com/race/tour-de-france/{today.year}/startlist/startlist"))
+    urls.append(("calendar", f"https://cykelkalenderen.dk/loebskalender?vis=liste&m={today.strftime('%Y-%m')}"))
+    for name, url in urls:
+        html, status = fetch(url)
+        if html is None:
+            print(f"⚠️  {name}: HTTP {status}")
+            continue
+        with open(os.path.join(directory, name + ".html"), "w", encoding="utf-8") as f:
+            f.write(html)
+        print(f"💾 {name}.html ({len(html) // 1024} KB)")
+
+
+def bench(pages, repeat):
+    funcs = _parsers_by_kind()
+    identical = True
+    print(f"\n⏱️  Parsere: {', '.join(available_parsers())} (+ {STREAM_PARSER} til ranking), "
+          f"{repeat} gentagelser")
+    print("-" * 70)
+    for kind in KINDS:
+        docs = pages.get(kind)
+        if not docs:
+            continue
+        parse = funcs[kind]
+        parsers = available_parsers() + ([STREAM_PARSER] if kind == "ranking" else [])
+        reference = [parse(html, REFERENCE_PARSER) for html in docs]
+        timings = {}
+        peaks = {}
+        for parser in parsers:
+            result = [parse(html, parser) for html in docs]
+            if result != reference:
+                identical = False
+                print(f"❌ {kind}: {parser} giver andre rækker end {REFERENCE_PARSER}")
+            tracemalloc.start()
+            for html in docs:
+                parse(html, parser)
+            peaks[parser] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            t0 = time.perf_counter()
+            for _ in range(repeat):
+                for html in docs:
+                    parse(html, parser)
+            timings[parser] = (time.perf_counter() - t0) / repeat
+        base = timings[REFERENCE_PARSER]
+        print(f"{kind:10s} {len(docs):3d} sider")
+        for p, t in timings.items():
+            print(f"   {p:12s} {t * 1000:8.1f} ms ({base / t:4.1f}x)   top {peaks[p] / 1024:8.0f} KB")
+    print("-" * 70)
+    print("✅ Samme rækker fra alle parsere" if identical else "❌ Parserne er uenige")
+    return identical
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Benchmark af HTML-parsere")
+    p.add_argument("--pages", help="mappe med gemte sider")
+    p.add_argument("--record", help="hent dagens sider og gem dem i denne mappe")
+    p.add_argument("--repeat", type=int, default=5)
+    args = p.parse_args(argv)
+
+    if args.record:
+        record_pages(args.record)
+        args.pages = args.pages or args.record
+    pages = load_pages(args.pages) if args.pages else synthetic_pages()
+    return 0 if bench(pages, args.repeat) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+"""
+OPSTARTS-BUDGET FOR DE DAGLIGE SCRIPTS
+Workflowet kører `python daily_update.py`, der importerer alle tre scripts
+plus sheets.py i én proces - dens import-tid er den der betales hver morgen.
+Scriptene kan stadig køres hver for sig og har derfor også deres eget budget.
+Dette script måler import-tiden med `python -X importtime`
+(samme tal som `python -X importtime -c "import <script>"`), viser de dyreste
+imports og sammenligner med et budget.
+
+    python bench_startup.py             # rapport + exit 1 hvis et budget er overskredet
+    python bench_startup.py --top 15    # vis flere imports
+
+Tunge biblioteker (gspread, oauth2client, cloudscraper, bs4, pandas) skal
+importeres inde i de funktioner der bruger dem - ikke øverst i scriptet.
+"""
+
+import os
+import sys
+import argparse
+import statistics
+import subprocess
+
+# Budget i millisekunder for at importere hvert script (kumulativ import-tid).
+STARTUP_BUDGET_MS = {
+    "update_automatic_cloudscraper": 300,
+    "scrape_upcoming_races": 150,
+    "scrape_tdf_startlist": 300,
+    "daily_update": 350,  # alle tre ovenfor + sheets; fælles moduler tælles kun én gang
+}
+
+# Må ikke blive importeret blot ved opstart
+LAZY_MODULES = ("gspread", "oauth2client", "cloudscraper", "bs4", "pandas")
+
+
+def measure(module, runs=3):
+    """Returnerer (median ms, [(import, kumulativ µs)]) for `import module`.
+    Listen er de imports `module` selv laver direkte."""
+    env = dict(os.environ, SCRAPER_METRICS_DIR="", PYTHONDONTWRITEBYTECODE="1")
+    totals, children = [], []
+    for _ in range(runs):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            env=env, capture_output=True, text=True,
+        )
+        if proc.returncode != 0:
+            raise RuntimeError(f"import {module} fejlede:\n{proc.stderr[-2000:]}")
+        entries = []  # (dybde, navn, kumulativ µs) i den rækkefølge imports bliver færdige
+        for line in proc.stderr.splitlines():
+            if not line.startswith("import time:"):
+                continue
+            try:
+                _, cumulative_us, name = line[len("import time:"):].split("|")
+                cumulative_us = int(cumulative_us)
+            except ValueError:
+                continue  # header-linjen
+            depth = (len(name) - len(name.lstrip()) - 1) // 2
+            entries.append((depth, name.strip(), cumulative_us))
+        idx = next(i for i, (d, n, _) in enumerate(entries) if d == 0 and n == module)
+        totals.append(entries[idx][2] / 1000)
+        # Børn står lige før forælderen i outputtet
+        children = []
+        for depth, name, cum in reversed(entries[:idx]):
+            if depth == 0:
+                break
+            if depth == 1:
+                children.append((name, cum))
+        children.sort(key=lambda x: -x[1])
+        imported = {n for _, n, _ in entries}
+    return statistics.median(totals), children, imported
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Mål import-tid for de daglige scripts")
+    p.add_argument("--top", type=int, default=8, help="antal dyreste imports der vises")
+    p.add_argument("--runs", type=int, default=3)
+    args = p.parse_args(argv)
+
+    over = False
+    print("\n⏱️  Import-tid pr. script (median af {} kørsler)".format(args.runs))
+    print("-" * 70)
+    for module, budget in STARTUP_BUDGET_MS.items():
+        total_ms, children, imported = measure(module, args.runs)
+        eager = [m for m in LAZY_MODULES if m in imported]
+        ok = total_ms <= budget and not eager
+        over |= not ok
+        print(f"{'✅' if ok else '❌'} {module:32s} {total_ms:7.1f} ms  (budget {budget} ms)")
+        if eager:
+            print(f"   ⚠️  importeres ved opstart: {', '.join(eager)}")
+        for name, cum in children[:args.top]:
+            print(f"      {name:40s} {cum / 1000:7.1f} ms")
+    print("-" * 70)
+    return 1 if over else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,216 @@
+"""
+Circuit breaker pr. hent-metode (FlareSolverr, cloudscraper, scraping-API).
+
+Når en metode fejler FAILURE_THRESHOLD gange i træk, "åbner" dens breaker, og
+fetch springer metoden over i en pause (cool-down) i stedet for at bruge
+retries og timeouts på den for hver eneste side. Efter pausen får metoden ét
+prøveforsøg (half-open): lykkes det, lukkes breakeren igen; fejler det, åbnes
+den med dobbelt så lang pause (op til MAX_COOLDOWN). Andre kaldere der vil
+bruge metoden mens prøveforsøget kører, venter på resultatet (wait_probe, højst
+SCRAPER_BREAKER_PROBE_WAIT sekunder) i stedet for at springe den over.
+
+Tilstanden gemmes i en lille JSON-fil (SCRAPER_HEALTH_FILE, standard
+.cache/fetch_health.json), så morgendagens kørsel starter med at springe de
+metoder over, der var blokeret i dag, og går direkte til den der virkede.
+"""
+
+import os
+import json
+import time
+import atexit
+import threading
+
+HEALTH_FILE = os.environ.get("SCRAPER_HEALTH_FILE", ".cache/fetch_health.json").strip()
+FAILURE_THRESHOLD = max(1, int(os.environ.get("SCRAPER_BREAKER_THRESHOLD", "3")))
+BASE_COOLDOWN = float(os.environ.get("SCRAPER_BREAKER_COOLDOWN", "1800"))  # 30 min
+MAX_COOLDOWN = 24 * 3600
+PROBE_WAIT = float(os.environ.get("SCRAPER_BREAKER_PROBE_WAIT", "180"))  # sek.
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Breaker for én metode. Tidspunkter er time.time(), så de giver mening
+    på tværs af kørsler."""
+
+    def __init__(self, name, state=None):
+        state = state or {}
+        self.name = name
+        self.state = state.get("state", CLOSED)
+        self.failures = int(state.get("failures", 0))
+        self.opened_at = float(state.get("opened_at", 0))
+        self.cooldown = float(state.get("cooldown", BASE_COOLDOWN))
+        self.last_success = state.get("last_success")
+        self._probing = False
+        if self.state == HALF_OPEN:
+            # Et prøveforsøg der aldrig blev afsluttet i sidste kørsel tæller ikke
+            self.state = OPEN
+
+    def allow(self):
+        """Må metoden bruges nu? I half-open får kun én kalder lov ad gangen."""
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN and time.time() - self.opened_at >= self.cooldown:
+            self.state = HALF_OPEN
+            print(f"   🔌 {self.name}: pause overstået - prøver igen")
+        if self.state == HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    @property
+    def probing(self):
+        return self.state == HALF_OPEN
+
+    @property
+    def probe_running(self):
+        return self.state == HALF_OPEN and self._probing
+
+    def release_probe(self):
+        """Prøveforsøget blev afbrudt uden resultat - næste kalder må prøve."""
+        self._probing = False
+
+    def record_success(self):
+        if self.state != CLOSED:
+            print(f"   🔌 {self.name}: virker igen")
+        self.state = CLOSED
+        self.failures = 0
+        self.cooldown = BASE_COOLDOWN
+        self.last_success = time.time()
+        self._probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == HALF_OPEN:
+            self.cooldown = min(MAX_COOLDOWN, self.cooldown * 2)
+            self._open()
+        elif self.state == CLOSED and self.failures >= FAILURE_THRESHOLD:
+            self._open()
+        self._probing = False
+
+    def _open(self):
+        self.state = OPEN
+        self.opened_at = time.time()
+        print(f"   🔌 {self.name}: {self.failures} fejl i træk - springes over "
+              f"i {self.cooldown / 60:.0f} min")
+
+    def to_dict(self):
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "opened_at": self.opened_at,
+            "cooldown": self.cooldown,
+            "last_success": self.last_success,
+        }
+
+
+class BreakerRegistry:
+    """Alle breakers + læsning/skrivning af tilstandsfilen. Trådsikker."""
+
+    def __init__(self, path=HEALTH_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._probe_done = threading.Condition(self._lock)
+        self._breakers = {}
+        self._saved = self._load()
+
+    def _load(self):
+        if not self.path:
+            return {}
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _get(self, name):
+        b = self._breakers.get(name)
+        if b is None:
+            b = self._breakers[name] = CircuitBreaker(name, self._saved.get(name))
+        return b
+
+    def allow(self, name):
+        with self._lock:
+            return self._get(name).allow()
+
+    def probing(self, name):
+        with self._lock:
+            return self._get(name).probing
+
+    def enter(self, name):
+        """(må bruges, er prøveforsøget) i ét opslag."""
+        with self._lock:
+            b = self._get(name)
+            allowed = b.allow()
+            return allowed, allowed and b.probing
+
+    def closed(self, name):
+        """Virker metoden (uden at starte et prøveforsøg)?"""
+        with self._lock:
+            return self._get(name).state == CLOSED
+
+    def probe_running(self, name):
+        with self._lock:
+            return self._get(name).probe_running
+
+    def wait_probe(self, name, timeout=PROBE_WAIT):
+        """Vent på et igangværende prøveforsøg og returnér så enter(name).
+        Kører det stadig efter `timeout`, gives (False, False)."""
+        deadline = time.monotonic() + timeout
+        with self._lock:
+            b = self._get(name)
+            while b.probe_running:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False, False
+                self._probe_done.wait(remaining)
+            allowed = b.allow()
+            return allowed, allowed and b.probing
+
+    def release(self, name):
+        """Frigiv et prøveforsøg der sluttede uden success/failure (fx annulleret)."""
+        with self._lock:
+            b = self._get(name)
+            if b.probe_running:
+                b.release_probe()
+                self._probe_done.notify_all()
+
+    def success(self, name):
+        with self._lock:
+            b = self._get(name)
+            changed = b.state != CLOSED or b.failures
+            b.record_success()
+            self._probe_done.notify_all()
+        if changed:
+            self.save()
+
+    def failure(self, name):
+        with self._lock:
+            b = self._get(name)
+            before = b.state
+            b.record_failure()
+            changed = b.state != before
+            self._probe_done.notify_all()
+        if changed:
+            self.save()
+
+    def save(self):
+        if not self.path:
+            return
+        with self._lock:
+            data = dict(self._saved)
+            data.update({name: b.to_dict() for name, b in self._breakers.items()})
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f"   Kunne ikke gemme fetch-tilstand i {self.path}: {e}")
+
+
+BREAKERS = BreakerRegistry()
+atexit.register(BREAKERS.save)
@@ -0,0 +1,51 @@
+"""
+DEN DAGLIGE OPDATERING I ÉN PROCES
+Kører point-opdateringen, kommende løb og TDF-startlisten efter hinanden i samme
+Python-proces, så Google-login, regnearket og faneblade (sheets.py), HTTP-
+forbindelser og FlareSolverr-sessioner (scraper_utils.py) kun sættes op én gang.
+Alle skrivninger til arket samles og sendes til sidst som ét kald (sheets.batched).
+
+    python daily_update.py
+
+Hvert job kører for sig: fejler ét, kører de næste alligevel. Exit-koden er 1
+hvis point-opdateringen fejlede - en exception, eller main() returnerede False
+(som når scriptet køres alene) - eller skrivningerne til arket ikke kunne
+sendes, ellers 0.
+"""
+
+import sys
+import traceback
+
+import sheets
+import update_automatic_cloudscraper
+import scrape_upcoming_races
+import scrape_tdf_startlist
+
+JOBS = [
+    ("UCI-point", update_automatic_cloudscraper.main, True),
+    ("Kommende løb", scrape_upcoming_races.main, False),
+    ("TDF-startliste", scrape_tdf_startlist.main, False),
+]
+
+
+def main():
+    failed = False
+    with sheets.batched() as batch:
+        for name, job, required in JOBS:
+            try:
+                if job() is False:
+                    print(f"❌ {name} fejlede")
+                    failed |= required
+            except Exception:
+                print(f"❌ {name} fejlede:")
+                traceback.print_exc()
+                failed |= required
+        print(f"\n💾 Sender {sheets.WRITES.queued_ranges} ranges til Google Sheets samlet...")
+    writes = sheets.WRITES
+    print(f"{'✅' if batch.ok else '❌'} {writes.requests} skrive-kald, {writes.retries} genforsøg, "
+          f"{writes.used_last_minute()}/{writes.quota} af kvoten brugt det sidste minut")
+    return 1 if failed or not batch.ok else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
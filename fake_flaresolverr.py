@@ -0,0 +1,388 @@
+"""
+LOKAL FLARESOLVERR-ATTRAP - til benchmarks og fejlsøgning uden netværk
+
+Taler samme /v1 JSON-protokol som FlareSolverr (sessions.create, sessions.list,
+sessions.destroy, request.get) og svarer med opdigtede PCS-sider i stedet for at
+starte en browser. Så kan fetch-strategierne (samtidighed, session-pulje,
+genbrug af cookies) og timeout-opførsel afprøves på en bærbar uden internet.
+
+Kør som server:
+    python fake_flaresolverr.py --port 8191 --latency 1.5 --error-rate 0.1
+    FLARESOLVERR_URL=http://localhost:8191/v1 python update_automatic_cloudscraper.py
+(Rigtige PCS-URL'er besvares med de opdigtede sider; cookie-genbrug kræver
+ --site-URL'er, se nedenfor.)
+
+Kør benchmark af strategierne:
+    python fake_flaresolverr.py --bench --pages 20 --latency 1.0
+
+Kør benchmark af parse-processerne (PCS_PARSE_WORKERS) pr. parser:
+    python fake_flaresolverr.py --bench-parse --latency 0.05
+
+Sider:
+  - rankings.php?...&offset=N  -> ranking-tabel med 100 ryttere (--riders i alt)
+  - .../startlist/...          -> startliste med --riders ryttere
+  - Findes --fixtures DIR, bruges DIR/<sha1(url)>.html hvis den findes.
+  - GET /site/<sti> på selve attrappen opfører sig som en Cloudflare-beskyttet
+    side: uden cf_clearance-cookie (som request.get udleverer) gives en
+    udfordring (403). Bruges til at måle genbrug af cookies.
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import random
+import hashlib
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+FAKE_USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+CLEARANCE_VALUE = "fake-clearance"
+CHALLENGE_HTML = "<html><head><title>Just a moment...</title></head><body>cf-chl-fake</body></html>"
+
+
+class Config:
+    def __init__(self, latency=1.0, jitter=0.2, session_latency=2.0, error_rate=0.0,
+                 challenge_fail_rate=0.0, challenge_timeout=5.0, riders=1500, fixtures=None,
+                 seed=None):
+        self.latency = latency                    # sek. pr. request.get (browserens arbejde)
+        self.jitter = jitter                      # +/- andel af latency
+        self.session_latency = session_latency    # sek. for sessions.create (browser-start)
+        self.error_rate = error_rate              # andel svar med status "error"
+        self.challenge_fail_rate = challenge_fail_rate  # andel "kunne ikke løse udfordringen"
+        self.challenge_timeout = challenge_timeout      # sek. der går før sådan en fejl meldes
+        self.riders = riders
+        self.fixtures = fixtures
+        self.random = random.Random(seed)
+
+
+# =============================================================================
+# Opdigtede sider
+# =============================================================================
+
+def ranking_page(offset, total):
+    rows = ['<tr><th>#</th><th>Prev</th><th>Diff</th><th>Rider</th><th>Team</th><th>Points</th></tr>']
+    for rank in range(offset + 1, min(offset + 100, total) + 1):
+        points = max(1, 5000 - rank * 3)
+        rows.append(
+            f'<tr><td>{rank}</td><td>{rank}</td><td>-</td>'
+            f'<td><span class="flag"></span> <a href="rider/rider-{rank}">RIDER{rank} Test</a></td>'
+            f'<td><a href="team/team-{rank % 30}">Team {rank % 30}</a></td>'
+            f'<td><a href="#">{points}</a></td></tr>'
+        )
+    return ('<html><head><title>Ranking</title><script>var x=1;</script></head><body>'
+            '<div class="nav"><a href="/">Home</a></div>'
+            f'<table class="basic">{"".join(rows)}</table>'
+            '<div class="footer">fake</div></body></html>')
+
+
+def startlist_page(total):
+    items = [f'<li><a href="rider/rider-{i}">RIDER{i} Test</a></li>' for i in range(1, total + 1)]
+    return ('<html><body><div class="sidebar"><a href="rider/x">Some Rider</a></div>'
+            f'<ul class="startlist">{"".join(items)}</ul></body></html>')
+
+
+def page_for(url, config):
+    if config.fixtures:
+        path = os.path.join(config.fixtures, hashlib.sha1(url.encode("utf-8")).hexdigest() + ".html")
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                return f.read(), 200
+    parts = urlsplit(url)
+    query = parse_qs(parts.query)
+    if "rankings.php" in parts.path:
+        offset = int((query.get("offset") or ["0"])[0] or 0)
+        return ranking_page(offset, config.riders), 200
+    if "/startlist" in parts.path:
+        return startlist_page(min(config.riders, 184)), 200
+    return "<html><body>ikke fundet</body></html>", 404
+
+
+# =============================================================================
+# Server
+# =============================================================================
+
+class FakeFlareSolverr:
+    """Selve attrappen. Holder styr på sessioner og tæller kald."""
+
+    def __init__(self, config):
+        self.config = config
+        self.sessions = set()
+        self.lock = threading.Lock()
+        self.counts = {"sessions.create": 0, "request.get": 0, "site": 0, "challenges": 0}
+
+    def _sleep(self, base):
+        if base <= 0:
+            return
+        j = self.config.jitter
+        time.sleep(base * self.config.random.uniform(1 - j, 1 + j))
+
+    def handle(self, payload):
+        cmd = payload.get("cmd")
+        with self.lock:
+            self.counts[cmd] = self.counts.get(cmd, 0) + 1
+        if cmd == "sessions.create":
+            self._sleep(self.config.session_latency)
+            sid = payload.get("session") or str(uuid.uuid4())
+            with self.lock:
+                self.sessions.add(sid)
+            return {"status": "ok", "message": "Session created successfully.", "session": sid}
+        if cmd == "sessions.list":
+            with self.lock:
+                return {"status": "ok", "sessions": sorted(self.sessions)}
+        if cmd == "sessions.destroy":
+            with self.lock:
+                existed = payload.get("session") in self.sessions
+                self.sessions.discard(payload.get("session"))
+            if not existed:
+                return {"status": "error", "message": "The session doesn't exist."}
+            return {"status": "ok", "message": "The session has been removed."}
+        if cmd == "request.get":
+            return self._request_get(payload)
+        return {"status": "error", "message": f"Request parameter 'cmd' = '{cmd}' is invalid."}
+
+    def _request_get(self, payload):
+        sid = payload.get("session")
+        if sid:
+            with self.lock:
+                known = sid in self.sessions
+            if not known:
+                return {"status": "error", "message": "This session does not exist."}
+        self._sleep(self.config.latency)
+        roll = self.config.random.random()
+        if roll < self.config.error_rate:
+            return {"status": "error", "message": "Error: fake browser crashed"}
+        if roll < self.config.error_rate + self.config.challenge_fail_rate:
+            timeout = payload.get("maxTimeout", 60000) / 1000
+            # Den rigtige FlareSolverr bruger hele maxTimeout; her højst challenge_timeout
+            time.sleep(min(timeout, self.config.challenge_timeout))
+            return {"status": "error",
+                    "message": f"Error: Error solving the challenge. Timeout after {timeout} seconds."}
+        url = payload.get("url", "")
+        html, status = page_for(url, self.config)
+        host = urlsplit(url).hostname or ""
+        return {
+            "status": "ok",
+            "message": "Challenge solved!",
+            "solution": {
+                "url": url,
+                "status": status,
+                "response": html,
+                "userAgent": FAKE_USER_AGENT,
+                "cookies": [{"name": "cf_clearance", "value": CLEARANCE_VALUE,
+                             "domain": host, "path": "/"}],
+                "headers": {},
+            },
+        }
+
+    def site(self, path, cookie_header, user_agent):
+        """GET /site/... - Cloudflare-lignende side der kræver cf_clearance + samme UA."""
+        with self.lock:
+            self.counts["site"] += 1
+        if f"cf_clearance={CLEARANCE_VALUE}" not in (cookie_header or "") or user_agent != FAKE_USER_AGENT:
+            with self.lock:
+                self.counts["challenges"] += 1
+            return CHALLENGE_HTML, 403
+        return page_for("https://fake" + path, self.config)
+
+
+def make_handler(fake):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status, body, content_type):
+            data = body.encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            if status == 403:
+                self.send_header("cf-mitigated", "challenge")
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path.startswith("/site/"):
+                html, status = fake.site(self.path[len("/site"):], self.headers.get("Cookie"),
+                                         self.headers.get("User-Agent"))
+                self._send(status, html, "text/html; charset=utf-8")
+            else:
+                self._send(200, json.dumps({"msg": "FlareSolverr is ready!", "version": "fake"}),
+                           "application/json")
+
+        def do_POST(self):
+            if self.path.rstrip("/") != "/v1":
+                self._send(404, json.dumps({"status": "error", "message": "not found"}), "application/json")
+                return
+            length = int(self.headers.get("Content-Length") or 0)
+            try:
+                payload = json.loads(self.rfile.read(length) or b"{}")
+            except ValueError:
+                self._send(500, json.dumps({"status": "error", "message": "invalid JSON"}), "application/json")
+                return
+            started = time.time()
+            result = fake.handle(payload)
+            result.setdefault("startTimestamp", int(started * 1000))
+            result.setdefault("endTimestamp", int(time.time() * 1000))
+            result.setdefault("version", "fake")
+            self._send(200 if result["status"] == "ok" else 500, json.dumps(result), "application/json")
+
+    return Handler
+
+
+def start_server(config, host="127.0.0.1", port=0):
+    """Start attrappen i en baggrundstråd. Returnerer (server, fake, base_url)."""
+    fake = FakeFlareSolverr(config)
+    server = ThreadingHTTPServer((host, port), make_handler(fake))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, fake, f"http://{host}:{server.server_address[1]}"
+
+
+# =============================================================================
+# Benchmark af fetch-strategier
+# =============================================================================
+
+def run_bench(config, pages):
+    # Slå tilstand fra, der ellers ville påvirke målingerne på tværs af strategier
+    os.environ["SCRAPER_HEALTH_FILE"] = ""
+    os.environ["SCRAPER_METRICS_DIR"] = ""
+    os.environ.pop("SCRAPER_CACHE_DIR", None)
+
+    server, fake, base = start_server(config)
+    os.environ["FLARESOLVERR_URL"] = base + "/v1"
+
+    from concurrent.futures import ThreadPoolExecutor
+    import scraper_utils
+    import rate_limit
+    import circuit_breaker
+
+    pcs_urls = [f"https://www.procyclingstats.com/rankings.php?p=uci-season-individual&offset={i * 100}"
+                for i in range(pages)]
+    site_urls = [f"{base}/site/rankings.php?offset={i * 100}" for i in range(pages)]
+
+    strategies = [
+        ("sekventielt, 1 session", pcs_urls, 1, 1, False),
+        ("4 samtidige, 1 session", pcs_urls, 4, 1, False),
+        ("4 samtidige, 4 sessioner", pcs_urls, 4, 4, False),
+        ("sekventielt + cookie-genbrug", site_urls, 1, 1, True),
+        ("4 samtidige, 4 sessioner + cookie-genbrug", site_urls, 4, 4, True),
+    ]
+
+    print(f"\n⏱️  {pages} sider pr. strategi, latency {config.latency}s, "
+          f"fejlrate {config.error_rate}, udfordrings-fejl {config.challenge_fail_rate}")
+    print("-" * 70)
+    for name, urls, workers, sessions, reuse in strategies:
+        scraper_utils._FS_POOL.close()
+        scraper_utils._FS_POOL = scraper_utils._SessionPool(sessions)
+        scraper_utils._CLEARANCE.close()
+        scraper_utils.COOKIE_REUSE = reuse
+        # Hver strategi starter forfra: åbne breakers og 429-ventetider fra den
+        # forrige må ikke gøre den næste langsommere eller få den til at fejle
+        scraper_utils.BREAKERS = circuit_breaker.BreakerRegistry(path="")
+        scraper_utils.LIMITER = rate_limit.HostRateLimiter(rate=0)  # måler strategierne, ikke rate-begrænseren
+        before = dict(fake.counts)
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(lambda u: scraper_utils.fetch(u, use_cache=False), urls))
+        elapsed = time.perf_counter() - t0
+        ok = sum(1 for html, _ in results if html is not None)
+        browser = fake.counts["request.get"] - before.get("request.get", 0)
+        print(f"{name:45s} {elapsed:7.2f}s  {ok}/{len(urls)} ok  {browser} browser-kald")
+    print("-" * 70)
+    scraper_utils._FS_POOL.close()
+    server.shutdown()
+
+
+def run_parse_bench(config, workers=(0, 2), repeat=3):
+    """Hele scrape_uci_ranking mod attrappen, pr. parser og antal parse-processer."""
+    os.environ["SCRAPER_HEALTH_FILE"] = ""
+    os.environ["SCRAPER_METRICS_DIR"] = ""
+    os.environ.pop("SCRAPER_CACHE_DIR", None)
+
+    server, _, base = start_server(config)
+    os.environ["FLARESOLVERR_URL"] = base + "/v1"
+
+    import io
+    import statistics
+    from contextlib import redirect_stdout
+    import circuit_breaker
+    import rate_limit
+    import scraper_utils
+    import update_automatic_cloudscraper as uci
+    from html_parsing import STREAM_PARSER, available_parsers
+
+    uci.PAGE_CACHE_FILE = ""  # alle sider skal parses hver gang
+    parsers = [STREAM_PARSER] + [name for name in available_parsers() if name != STREAM_PARSER]
+
+    print(f"\n⏱️  {config.riders} ryttere, latency {config.latency}s, "
+          f"median af {repeat} kørsler")
+    print("-" * 70)
+    reference = None
+    for parser in parsers:
+        uci.RANKING_PARSER = parser
+        for n in workers:
+            times = []
+            for _ in range(repeat):
+                scraper_utils.BREAKERS = circuit_breaker.BreakerRegistry(path="")
+                scraper_utils.LIMITER = rate_limit.HostRateLimiter(rate=0)
+                t0 = time.perf_counter()
+                with redirect_stdout(io.StringIO()):
+                    rows = uci.scrape_uci_ranking(parse_workers=n)
+                times.append(time.perf_counter() - t0)
+            reference = reference if reference is not None else rows
+            same = "samme rækker" if rows == reference else "❌ ANDRE RÆKKER"
+            print(f"{parser:12s} {n} parse-processer  {statistics.median(times):6.2f}s  "
+                  f"{len(rows or [])} ryttere, {same}")
+    print("-" * 70)
+    scraper_utils._FS_POOL.close()
+    server.shutdown()
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Lokal FlareSolverr-attrap")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8191)
+    p.add_argument("--latency", type=float, default=1.0, help="sek. pr. request.get")
+    p.add_argument("--jitter", type=float, default=0.2, help="+/- andel af latency")
+    p.add_argument("--session-latency", type=float, default=2.0, help="sek. pr. sessions.create")
+    p.add_argument("--error-rate", type=float, default=0.0)
+    p.add_argument("--challenge-fail-rate", type=float, default=0.0)
+    p.add_argument("--challenge-timeout", type=float, default=5.0,
+                   help="sek. før en fejlet udfordring meldes (højst klientens maxTimeout)")
+    p.add_argument("--riders", type=int, default=1500)
+    p.add_argument("--fixtures", help="mappe med <sha1(url)>.html-filer")
+    p.add_argument("--seed", type=int)
+    p.add_argument("--bench", action="store_true", help="kør benchmark af fetch-strategier")
+    p.add_argument("--pages", type=int, default=12, help="antal sider i benchmark")
+    p.add_argument("--bench-parse", action="store_true",
+                   help="kør benchmark af parse-processer (PCS_PARSE_WORKERS) pr. parser")
+    args = p.parse_args(argv)
+
+    config = Config(latency=args.latency, jitter=args.jitter, session_latency=args.session_latency,
+                    error_rate=args.error_rate, challenge_fail_rate=args.challenge_fail_rate,
+                    challenge_timeout=args.challenge_timeout,
+                    riders=args.riders, fixtures=args.fixtures, seed=args.seed)
+
+    if args.bench:
+        run_bench(config, args.pages)
+        return
+    if args.bench_parse:
+        run_parse_bench(config)
+        return
+
+    server, _, base = start_server(config, args.host, args.port)
+    print(f"🧪 Falsk FlareSolverr kører på {base}/v1 (Ctrl+C for at stoppe)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
+    sys.exit(0)
@@ -0,0 +1,366 @@
+"""
+LOKAL GOOGLE SHEETS-ATTRAP - til benchmarks af skrivestrategier uden login
+
+Efterligner den del af gspread som jobbene bruger (Spreadsheet.worksheet,
+add_worksheet, values_batch_update, values_batch_clear; Worksheet.get_all_values,
+batch_update, update, clear) i
+hukommelsen, med kunstig ventetid og Googles kvote (antal kald pr. minut, svar
+429 når den er brugt). Fejl rejses som gspread.exceptions.APIError ligesom hos
+Google, så retry-logik kan afprøves.
+
+Kør benchmark af skrivestrategierne (pr. række, diff + rektangler, diff +
+kolonneblokke) på en tom, en stille og en travl dag:
+    python fake_sheets.py --riders 300 --latency 0.2 --range-latency 0.002
+
+Brug i egne forsøg:
+    import fake_sheets, sheets
+    book = fake_sheets.FakeSpreadsheet(fake_sheets.Config(latency=0))
+    sheets.use(book)       # sheets.worksheet('Points') giver nu attrappens faneblad
+"""
+
+import re
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+from collections import deque
+
+QUOTA_WINDOW = 60.0  # Googles kvoter tælles pr. minut
+
+
+class Config:
+    def __init__(self, latency=0.2, jitter=0.2, range_latency=0.0, cell_latency=0.0,
+                 quota_per_minute=60, error_rate=0.0, seed=None):
+        self.latency = latency                    # sek. pr. API-kald
+        self.jitter = jitter                      # +/- andel af latency
+        self.range_latency = range_latency        # ekstra sek. pr. range i batch_update
+        self.cell_latency = cell_latency          # ekstra sek. pr. skrevet celle
+        self.quota_per_minute = quota_per_minute  # kald pr. minut før 429 (0 = ubegrænset)
+        self.error_rate = error_rate              # andel kald der svarer 503
+        self.random = random.Random(seed)
+
+
+class _FakeResponse:
+    """Nok af requests.Response til at gspread.exceptions.APIError kan bygges."""
+
+    def __init__(self, status, message):
+        self.status_code = status
+        self.text = json.dumps({"error": {"code": status, "message": message}})
+
+    def json(self):
+        return json.loads(self.text)
+
+
+def api_error(status, message):
+    import gspread
+    return gspread.exceptions.APIError(_FakeResponse(status, message))
+
+
+_A1 = re.compile(r"^([A-Z]+)(\d+)$")
+
+
+def parse_a1(a1):
+    """'B2' -> (2, 2); 'B2:C5' -> ((2, 2), (5, 3)) som (række, kolonne)."""
+    def cell(ref):
+        m = _A1.match(ref.split("!")[-1])
+        if not m:
+            raise ValueError(f"ukendt range: {a1}")
+        col = 0
+        for ch in m.group(1):
+            col = col * 26 + ord(ch) - ord("A") + 1
+        return int(m.group(2)), col
+    if ":" in a1:
+        start, end = a1.split(":", 1)
+        return cell(start), cell(end)
+    return cell(a1)
+
+
+class FakeWorksheet:
+    def __init__(self, spreadsheet, title, rows=1000, cols=26, values=None):
+        self.spreadsheet = spreadsheet
+        self.title = title
+        self.row_count = rows
+        self.col_count = cols
+        self._grid = [[str(v) for v in row] for row in (values or [])]
+
+    # -- hjælpere -------------------------------------------------------------
+
+    def _write(self, row, col, values):
+        for r, line in enumerate(values):
+            while len(self._grid) < row + r:
+                self._grid.append([])
+            target = self._grid[row + r - 1]
+            for c, value in enumerate(line):
+                while len(target) < col + c:
+                    target.append("")
+                target[col + c - 1] = "" if value is None else str(value)
+        return sum(len(line) for line in values)
+
+    def _write_range(self, a1, values):
+        ref = parse_a1(a1)
+        start = ref[0] if isinstance(ref[0], tuple) else ref
+        return self._write(start[0], start[1], values)
+
+    # -- gspread-API ----------------------------------------------------------
+
+    def get_all_values(self):
+        self.spreadsheet._call("get_all_values")
+        width = max((len(r) for r in self._grid), default=0)
+        rows = [r + [""] * (width - len(r)) for r in self._grid]
+        while rows and not any(rows[-1]):
+            rows.pop()
+        return [list(r) for r in rows]
+
+    def batch_update(self, data, **kwargs):
+        cells = sum(len(line) for u in data for line in u["values"])
+        self.spreadsheet._call("batch_update", ranges=len(data), cells=cells)
+        for u in data:
+            self._write_range(u["range"], u["values"])
+        return {"totalUpdatedCells": cells}
+
+    def update(self, range_name=None, values=None, **kwargs):
+        values = values if values is not None else kwargs.get("values", [])
+        cells = sum(len(line) for line in values)
+        self.spreadsheet._call("update", ranges=1, cells=cells)
+        self._write_range(range_name or "A1", values)
+        return {"updatedCells": cells}
+
+    def clear(self):
+        self.spreadsheet._call("clear")
+        self._grid = []
+
+
+class FakeSpreadsheet:
+    """Regneark i hukommelsen med tællere for kald, ranges, celler og 429-svar."""
+
+    def __init__(self, config=None, worksheets=None, clock=time.monotonic):
+        self.config = config or Config()
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._recent = deque()  # tidspunkter for kald inden for kvote-vinduet
+        self.counts = {}
+        self.ranges_written = 0
+        self.cells_written = 0
+        self.quota_errors = 0
+        self.server_errors = 0
+        self._worksheets = {}
+        for title, values in (worksheets or {}).items():
+            self._worksheets[title] = FakeWorksheet(self, title, values=values)
+
+    def _call(self, kind, ranges=0, cells=0):
+        cfg = self.config
+        with self._lock:
+            now = self.clock()
+            while self._recent and now - self._recent[0] >= QUOTA_WINDOW:
+                self._recent.popleft()
+            if cfg.quota_per_minute and len(self._recent) >= cfg.quota_per_minute:
+                self.quota_errors += 1
+                raise api_error(429, "Quota exceeded for quota metric 'Requests per minute' (fake)")
+            self._recent.append(now)
+            self.counts[kind] = self.counts.get(kind, 0) + 1
+            fail = cfg.error_rate and cfg.random.random() < cfg.error_rate
+            delay = cfg.latency * (1 + cfg.random.uniform(-cfg.jitter, cfg.jitter))
+            delay += ranges * cfg.range_latency + cells * cfg.cell_latency
+        if delay > 0:
+            time.sleep(delay)
+        if fail:
+            with self._lock:
+                self.server_errors += 1
+            raise api_error(503, "The service is currently unavailable (fake)")
+        with self._lock:
+            self.ranges_written += ranges
+            self.cells_written += cells
+
+    @property
+    def requests(self):
+        return sum(self.counts.values())
+
+    def worksheet(self, title):
+        self._call("worksheet")
+        if title not in self._worksheets:
+            import gspread
+            raise gspread.exceptions.WorksheetNotFound(title)
+        return self._worksheets[title]
+
+    def add_worksheet(self, title, rows, cols, **kwargs):
+        self._call("add_worksheet")
+        self._worksheets[title] = FakeWorksheet(self, title, rows, cols)
+        return self._worksheets[title]
+
+    def worksheets(self):
+        return list(self._worksheets.values())
+
+    def _split_range(self, ref):
+        # "'Kommende Løb'!A1" -> (faneblad, "A1"); et fanebladsnavn alene -> (faneblad, None)
+        title, _, a1 = ref.rpartition("!") if "!" in ref else (ref, "", "")
+        title = title.strip("'").replace("''", "'")
+        if title not in self._worksheets:
+            raise api_error(400, f"Unable to parse range: {ref}")
+        return self._worksheets[title], a1 or None
+
+    def values_batch_update(self, params=None, body=None):
+        data = body["data"]
+        cells = sum(len(line) for u in data for line in u["values"])
+        self._call("values_batch_update", ranges=len(data), cells=cells)
+        for u in data:
+            sheet, a1 = self._split_range(u["range"])
+            sheet._write_range(a1 or "A1", u["values"])
+        return {"totalUpdatedCells": cells}
+
+    def values_batch_clear(self, params=None, body=None):
+        self._call("values_batch_clear")
+        for ref in body["ranges"]:
+            sheet, a1 = self._split_range(ref)
+            if a1 is not None:
+                raise ValueError("attrappen kan kun rydde hele faneblade")
+            sheet._grid = []
+        return {}
+
+
+# =============================================================================
+# Benchmark af skrivestrategier
+# =============================================================================
+
+def _points_sheet(riders):
+    return [["Rytter", "Point", "Opdateret", "TDF"]] + [[f"RIDER{i} Test", "", "", ""]
+                                                         for i in range(1, riders + 1)]
+
+
+def _per_row(snapshot, wanted, changed):
+    # Den gamle måde: én range pr. rytter med point + dato, hver dag
+    today = time.strftime("%Y-%m-%d")
+    return [{"range": f"B{row}:C{row}", "values": [[value, today]]}
+            for (row, _), value in sorted(wanted.items())]
+
+
+def _diff(planner):
+    def strategy(snapshot, wanted, changed):
+        today = time.strftime("%Y-%m-%d")
+        cells = dict(changed)
+        for row, _ in changed:
+            cells[(row, 3)] = today
+        return planner(snapshot, cells, wanted)
+    return strategy
+
+
+def run_bench(config, riders, seed=1):
+    from sheet_writes import changed_cells, coalesce_ranges, plan_writes
+
+    strategies = [
+        ("pr. række (før)", _per_row),
+        ("diff + rektangler", _diff(lambda s, c, w: coalesce_ranges(c))),
+        ("diff + plan_writes", _diff(plan_writes)),
+    ]
+    rng = random.Random(seed)
+    day1 = {(i + 1, 2): max(0, 3000 - i * 7) for i in range(1, riders + 1)}
+    day2 = dict(day1)
+    for cell in rng.sample(sorted(day2), max(1, riders // 50)):
+        day2[cell] += rng.randint(1, 50)
+    day3 = dict(day2)
+    for cell in rng.sample(sorted(day3), riders * 2 // 5):
+        day3[cell] += rng.randint(1, 50)
+    days = [("tom", day1), ("stille", day2), ("travl", day3)]
+
+    # Strategierne sammenlignes uden fejl og kvote; det måles i _bench_queue
+    error_rate, config.error_rate = config.error_rate, 0.0
+    quota, config.quota_per_minute = config.quota_per_minute, 0
+    print(f"\n⏱️  {riders} ryttere, latency {config.latency}s + {config.range_latency * 1000:.1f} ms/range")
+    print("-" * 78)
+    print(f"{'strategi':22s} {'dag':8s} {'tid':>8s} {'kald':>5s} {'ranges':>7s} {'celler':>7s} {'uændret':>8s}")
+    for name, strategy in strategies:
+        book = FakeSpreadsheet(config, {"Points": _points_sheet(riders)})
+        sheet = book._worksheets["Points"]
+        for day, wanted in days:
+            before = (book.requests, book.ranges_written, book.cells_written)
+            t0 = time.perf_counter()
+            snapshot = sheet.get_all_values()
+            changed = changed_cells(snapshot, wanted)
+            updates = strategy(snapshot, wanted, changed)
+            if updates:
+                sheet.batch_update(updates)
+            elapsed = time.perf_counter() - t0
+            print(f"{name:22s} {day:8s} {elapsed:7.2f}s {book.requests - before[0]:5d} "
+                  f"{book.ranges_written - before[1]:7d} {book.cells_written - before[2]:7d} "
+                  f"{len(wanted) - len(changed):8d}")
+    print("-" * 78)
+    config.error_rate, config.quota_per_minute = error_rate, quota
+    _bench_queue(config, riders)
+
+
+def _bench_queue(config, riders):
+    """De tre jobs skriver hver for sig vs. samlet gennem sheets.batched()."""
+    import sheets
+
+    print(f"Skrive-kø, fejlrate {config.error_rate}, kvote {config.quota_per_minute}/min "
+          f"(ventetid i køen er simuleret)")
+    for name, together in (("hver for sig", False), ("samlet (batched)", True)):
+        clock = _VirtualClock()
+        book = FakeSpreadsheet(config, {"Points": _points_sheet(riders), "Kommende Løb": []}, clock)
+        sheets.use(book)
+        sheets.WRITES = queue = sheets.WriteQueue(quota=config.quota_per_minute or sheets.WRITE_QUOTA,
+                                                  sleep=clock.sleep, clock=clock)
+        points, races = book._worksheets["Points"], book._worksheets["Kommende Løb"]
+        t0 = time.perf_counter()
+        with (sheets.batched() if together else _nothing()) as batch:
+            sheets.write(points, [{"range": f"B2:C{riders + 1}",
+                                   "values": [[i, "2026-01-01"] for i in range(riders)]}])
+            sheets.clear(races)
+            sheets.write(races, [{"range": "A1", "values": [["Dato", "Løb"], ["01.01", "Løb"]]}])
+            sheets.write(points, [{"range": "D2", "values": [["TDF"]]}])
+        ok = batch.ok if together else True
+        print(f"   {name:20s} {time.perf_counter() - t0 + clock.slept:6.2f}s  {queue.requests} kald, "
+              f"{queue.retries} genforsøg, {book.quota_errors} x 429, {book.server_errors} x 503"
+              f"{'' if ok else '  ❌ fejlede'}")
+    sheets.reset()
+    sheets.WRITES = sheets.WriteQueue()
+    print("-" * 78)
+
+
+class _VirtualClock:
+    """monotonic() der kun går frem når nogen 'sover' - så backoff og kvote-ventetid
+    kan måles uden at vente i virkeligheden."""
+
+    def __init__(self):
+        self.start = time.monotonic()
+        self.slept = 0.0
+
+    def __call__(self):
+        return time.monotonic() + self.slept
+
+    def sleep(self, seconds):
+        self.slept += max(0.0, seconds)
+
+
+class _nothing:
+    ok = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Lokal Google Sheets-attrap")
+    p.add_argument("--riders", type=int, default=300)
+    p.add_argument("--latency", type=float, default=0.2, help="sek. pr. API-kald")
+    p.add_argument("--jitter", type=float, default=0.2, help="+/- andel af latency")
+    p.add_argument("--range-latency", type=float, default=0.002, help="ekstra sek. pr. range")
+    p.add_argument("--cell-latency", type=float, default=0.0, help="ekstra sek. pr. celle")
+    p.add_argument("--quota", type=int, default=60, help="kald pr. minut før 429 (0 = ingen)")
+    p.add_argument("--error-rate", type=float, default=0.0, help="andel kald der svarer 503")
+    p.add_argument("--seed", type=int)
+    args = p.parse_args(argv)
+
+    config = Config(latency=args.latency, jitter=args.jitter, range_latency=args.range_latency,
+                    cell_latency=args.cell_latency, quota_per_minute=args.quota,
+                    error_rate=args.error_rate, seed=args.seed)
+    run_bench(config, args.riders)
+
+
+if __name__ == "__main__":
+    main()
+    sys.exit(0)
@@ -0,0 +1,193 @@
+"""
+Målinger for scraper_utils.fetch: hvor går tiden i det daglige job?
+
+For hvert kald registreres hvilken metode der leverede siden (cache, genbrugte
+cookies, FlareSolverr, cloudscraper, scraping-API eller ingen), antal forsøg,
+samlet tid, bytes, statuskode og hvor længe vi ventede på rate-begrænseren.
+Tallene samles i histogrammer pr. metode og skrives ved afslutning til:
+
+  <SCRAPER_METRICS_DIR>/fetch_metrics_<script>.json   (læsbart, til at sammenligne kørsler)
+  <SCRAPER_METRICS_DIR>/fetch_metrics_<script>.prom   (Prometheus text format)
+
+SCRAPER_METRICS_DIR er som standard "metrics"; sæt den til tom streng for at slå
+filerne fra. Workflowet gemmer mappen som artifact.
+"""
+
+import os
+import sys
+import json
+import time
+import atexit
+import threading
+
+METRICS_DIR = os.environ.get("SCRAPER_METRICS_DIR", "metrics").strip()
+
+# Øvre grænser (sekunder) for histogram-spandene
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # sidste spand = +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, upper in enumerate(self.buckets):
+            if value <= upper:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        """[(le, antal <= le)] inkl. +Inf, som Prometheus forventer."""
+        out, total = [], 0
+        for upper, n in zip(list(self.buckets) + ["+Inf"], self.counts):
+            total += n
+            out.append((upper, total))
+        return out
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 4),
+            "buckets": {str(le): n for le, n in self.cumulative()},
+        }
+
+
+class CallRecord:
+    """Målinger for ét fetch-kald. Udfyldes af plan-køreren i scraper_utils."""
+
+    def __init__(self, url):
+        self.url = url
+        self.started = time.perf_counter()
+        self.tier = None
+        self.attempts = 0
+        self.slept = 0.0
+        self.attempt_times = []  # (metode, sekunder)
+
+    def sleep(self, seconds):
+        self.slept += seconds
+
+    def attempt(self, seconds):
+        self.attempts += 1
+        self.attempt_times.append((self.tier, seconds))
+
+
+class FetchMetrics:
+    """Trådsikker opsamling af CallRecords."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.served = {}          # metode -> antal sider leveret
+        self.failed = 0
+        self.statuses = {}        # statuskode -> antal
+        self.bytes = {}           # metode -> bytes
+        self.attempts = {}        # metode -> antal forsøg
+        self.slept = 0.0
+        self.fetch_latency = {}   # leverende metode -> Histogram (hele kaldet)
+        self.attempt_latency = {} # metode -> Histogram (hvert enkelt forsøg)
+
+    def start(self, url):
+        return CallRecord(url)
+
+    def finish(self, rec, html, status, served_by=None):
+        elapsed = time.perf_counter() - rec.started
+        tier = (served_by or rec.tier or "none") if html is not None else "none"
+        with self._lock:
+            self.calls += 1
+            self.slept += rec.slept
+            if html is None:
+                self.failed += 1
+            else:
+                self.served[tier] = self.served.get(tier, 0) + 1
+                self.bytes[tier] = self.bytes.get(tier, 0) + len(html.encode("utf-8"))
+            key = str(status)
+            self.statuses[key] = self.statuses.get(key, 0) + 1
+            self.fetch_latency.setdefault(tier, Histogram()).observe(elapsed)
+            for attempt_tier, seconds in rec.attempt_times:
+                name = attempt_tier or "none"
+                self.attempts[name] = self.attempts.get(name, 0) + 1
+                self.attempt_latency.setdefault(name, Histogram()).observe(seconds)
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "failed": self.failed,
+                "served_by": dict(self.served),
+                "statuses": dict(self.statuses),
+                "bytes": dict(self.bytes),
+                "attempts": dict(self.attempts),
+                "sleep_seconds": round(self.slept, 4),
+                "fetch_seconds": {t: h.to_dict() for t, h in self.fetch_latency.items()},
+                "attempt_seconds": {t: h.to_dict() for t, h in self.attempt_latency.items()},
+            }
+
+    def to_prometheus(self):
+        d = self.to_dict()
+        lines = [
+            "# HELP scraper_fetch_calls_total Kald til fetch, fordelt på leverende metode.",
+            "# TYPE scraper_fetch_calls_total counter",
+        ]
+        for tier, n in sorted(d["served_by"].items()):
+            lines.append(f'scraper_fetch_calls_total{{tier="{tier}"}} {n}')
+        lines.append(f'scraper_fetch_calls_total{{tier="none"}} {d["failed"]}')
+        lines += ["# HELP scraper_fetch_status_total Statuskoder returneret af fetch.",
+                  "# TYPE scraper_fetch_status_total counter"]
+        for status, n in sorted(d["statuses"].items()):
+            lines.append(f'scraper_fetch_status_total{{status="{status}"}} {n}')
+        lines += ["# HELP scraper_fetch_bytes_total Bytes leveret pr. metode.",
+                  "# TYPE scraper_fetch_bytes_total counter"]
+        for tier, n in sorted(d["bytes"].items()):
+            lines.append(f'scraper_fetch_bytes_total{{tier="{tier}"}} {n}')
+        lines += ["# HELP scraper_fetch_attempts_total Forsøg pr. metode (også fejlede).",
+                  "# TYPE scraper_fetch_attempts_total counter"]
+        for tier, n in sorted(d["attempts"].items()):
+            lines.append(f'scraper_fetch_attempts_total{{tier="{tier}"}} {n}')
+        lines += ["# HELP scraper_fetch_sleep_seconds_total Tid brugt på at vente på rate-begrænseren.",
+                  "# TYPE scraper_fetch_sleep_seconds_total counter",
+                  f"scraper_fetch_sleep_seconds_total {d['sleep_seconds']}"]
+        with self._lock:
+            hists = [("scraper_fetch_seconds", "Samlet tid pr. fetch-kald.", self.fetch_latency),
+                     ("scraper_fetch_attempt_seconds", "Tid pr. forsøg pr. metode.", self.attempt_latency)]
+            for name, help_text, by_tier in hists:
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+                for tier, h in sorted(by_tier.items()):
+                    for le, n in h.cumulative():
+                        lines.append(f'{name}_bucket{{tier="{tier}",le="{le}"}} {n}')
+                    lines.append(f'{name}_sum{{tier="{tier}"}} {h.sum:.4f}')
+                    lines.append(f'{name}_count{{tier="{tier}"}} {h.count}')
+        return "\n".join(lines) + "\n"
+
+    def report(self):
+        if not self.calls:
+            return
+        d = self.to_dict()
+        served = ", ".join(f"{t}: {n}" for t, n in sorted(d["served_by"].items())) or "-"
+        print(f"📈 fetch: {d['calls']} kald ({served}; {d['failed']} fejlede), "
+              f"{d['sleep_seconds']:.1f} sek. ventetid")
+
+    def write(self, directory=METRICS_DIR):
+        if not directory or not self.calls:
+            return
+        script = os.path.splitext(os.path.basename(sys.argv[0] or "fetch"))[0] or "fetch"
+        try:
+            os.makedirs(directory, exist_ok=True)
+            base = os.path.join(directory, f"fetch_metrics_{script}")
+            with open(base + ".json", "w", encoding="utf-8") as f:
+                json.dump(self.to_dict(), f, indent=2)
+            with open(base + ".prom", "w", encoding="utf-8") as f:
+                f.write(self.to_prometheus())
+        except OSError as e:
+            print(f"   Kunne ikke skrive fetch-målinger til {directory}: {e}")
+
+
+METRICS = FetchMetrics()
+atexit.register(METRICS.write)
+atexit.register(METRICS.report)
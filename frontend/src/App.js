@@ -1,5 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import { Trophy, Users, TrendingUp, RefreshCw, Calendar, Award, ChevronDown, ChevronUp, ExternalLink } from 'lucide-react';
+// Færdigberegnede filnavne pr. rytter - genereres med `python rider_names.py`
+import RIDER_KEYS from './riderKeys.json';
 
 // GOOGLE SHEETS CONFIGURATION
 const GOOGLE_SHEET_ID = '1RfoTiYhMI-Yr7123evM4_PeSYn87W20UCBerhqV_Ztg';
@@ -301,7 +303,7 @@ const TEAMS = {
 };
 
 // Funktion til at normalisere navn (fjern accenter) for fil-lookup
-const normalizeForFile = (name) => {
+const normalizeName = (name) => {
   return name
     .normalize('NFD')
     .replace(/[\u0300-\u036f]/g, '') // Fjern accenter (\u00e9, \u00fc, \u010d osv.)
@@ -311,6 +313,18 @@ const normalizeForFile = (name) => {
     .replace(/['\u2018\u2019]/g, ''); // Fjern apostroffer (lige og kr\u00f8llede)
 };
 
+// Slå filnavnet op i RIDER_KEYS (samme regler som rider_names.file_name i Python);
+// navne der ikke står der, normaliseres én gang og huskes
+const fileNameCache = new Map(Object.entries(RIDER_KEYS.files));
+const normalizeForFile = (name) => {
+  let file = fileNameCache.get(name);
+  if (file === undefined) {
+    file = normalizeName(name);
+    fileNameCache.set(name, file);
+  }
+  return file;
+};
+
 // Funktion til at konvertere rytter navn til foto URL
 const getRiderPhotoUrl = (riderName) => {
   // Normaliser navnet for fil-lookup (fjern accenter)
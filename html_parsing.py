@@ -0,0 +1,168 @@
+"""
+Valg af HTML-parser til BeautifulSoup.
+
+'html.parser' (Pythons indbyggede) er referencen, men også den langsomste.
+Er lxml installeret (se requirements.txt), bruges den som standard - den giver
+de samme rækker for vores sider, bare hurtigere. Kan tvinges med
+SCRAPER_HTML_PARSER=html.parser eller SCRAPER_HTML_PARSER=lxml.
+
+Til ranking-siderne, hvor vi kun skal bruge celleteksten fra én tabel, findes
+desuden en strømmende udtrækker (iter_table_rows) der slet ikke bygger et DOM.
+
+Se bench_parsers.py for en sammenligning på gemte sider.
+"""
+
+import os
+import re
+from html.parser import HTMLParser
+
+REFERENCE_PARSER = "html.parser"
+STREAM_PARSER = "stream"  # kun til tabeller, se iter_table_rows
+
+
+def _lxml_available():
+    import importlib.util
+    return importlib.util.find_spec("lxml") is not None
+
+
+def available_parsers():
+    return [REFERENCE_PARSER] + (["lxml"] if _lxml_available() else [])
+
+
+def _default_parser():
+    wanted = os.environ.get("SCRAPER_HTML_PARSER", "").strip()
+    if wanted:
+        return wanted
+    return "lxml" if _lxml_available() else REFERENCE_PARSER
+
+
+PARSER = _default_parser()
+
+
+def make_soup(html, parser=None):
+    """BeautifulSoup med den valgte parser (standard PARSER)."""
+    from bs4 import BeautifulSoup  # først når der skal parses (se bench_startup.py)
+    return BeautifulSoup(html, parser or PARSER)
+
+
+# =============================================================================
+# Strømmende tabel-udtrækker
+# =============================================================================
+
+STREAM_CHUNK = 16 * 1024
+_CELL_TAGS = ("td", "th")
+_SKIP_TEXT_TAGS = ("script", "style", "template")
+
+
+class _TableRowParser(HTMLParser):
+    """Samler celletekst for første <table> på siden.
+
+    Teksten i en celle bygges som BeautifulSoups cell.get_text(' ', strip=True):
+    hver tekstbid strippes, tomme bidder droppes, resten samles med ét mellemrum
+    (så "RYTTER Navn" + holdlink i samme celle bliver "RYTTER Navn Hold").
+    Kommentarer og <script>/<style> tæller ikke med. Som i en browser lukker en
+    ny <td>/<th> den forrige celle og en ny <tr> den forrige række.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.rows = []          # færdige rækker der endnu ikke er givet videre
+        self.found = False      # har vi set en <table>?
+        self.done = False       # er første tabel slut?
+        self._depth = 0         # <table>-dybde (indlejrede tabeller er bare tekst)
+        self._row = None
+        self._cell = None
+        self._skip = 0
+        self._text = []         # tekst siden sidste tag (kan komme i flere bidder)
+
+    def _flush_text(self):
+        if self._text:
+            text = "".join(self._text).strip()
+            self._text = []
+            if text:
+                self._cell.append(text)
+
+    def handle_starttag(self, tag, attrs):
+        if self.done:
+            return
+        self._flush_text()
+        if tag == "table":
+            self.found = True
+            self._depth += 1
+            return
+        if not self._depth:
+            return
+        if tag in _SKIP_TEXT_TAGS:
+            self._skip += 1
+        elif self._depth == 1 and tag == "tr":
+            self._close_row()
+            self._row = []
+        elif self._depth == 1 and tag in _CELL_TAGS:
+            self._close_cell()
+            if self._row is None:
+                self._row = []
+            self._cell = []
+
+    def handle_endtag(self, tag):
+        if self.done or not self._depth:
+            return
+        self._flush_text()
+        if tag in _SKIP_TEXT_TAGS:
+            self._skip = max(0, self._skip - 1)
+        elif tag == "table":
+            self._depth -= 1
+            if not self._depth:
+                self._close_row()
+                self.done = True
+        elif self._depth == 1 and tag in _CELL_TAGS:
+            self._close_cell()
+        elif self._depth == 1 and tag == "tr":
+            self._close_row()
+
+    def handle_data(self, data):
+        # HTMLParser kan dele én tekstnode over flere kald (fx ved chunk-grænser),
+        # så teksten samles og strippes først ved næste tag/kommentar.
+        if self._cell is not None and not self._skip:
+            self._text.append(data)
+
+    def handle_comment(self, data):
+        if self._cell is not None:
+            self._flush_text()
+
+    def _close_cell(self):
+        if self._cell is not None:
+            self._flush_text()
+            self._row.append(" ".join(self._cell))
+            self._cell = None
+
+    def _close_row(self):
+        self._close_cell()
+        if self._row is not None:
+            if self._row:
+                self.rows.append(self._row)
+            self._row = None
+
+
+def iter_table_rows(html, chunk_size=STREAM_CHUNK):
+    """Giv cellerne (liste af tekster) for hver <tr> i sidens første <table>,
+    efterhånden som rækkerne lukkes. Læser ikke videre når tabellen er slut.
+    Rækker uden celler springes over (som find_all(['td', 'th']) der er tom)."""
+    parser = _TableRowParser()
+    for start in range(0, len(html), chunk_size):
+        parser.feed(html[start:start + chunk_size])
+        if parser.rows:
+            yield from parser.rows
+            parser.rows = []
+        if parser.done:
+            return
+    parser.close()
+    parser._close_row()
+    yield from parser.rows
+
+
+_TABLE_START = re.compile(r"<table\b", re.IGNORECASE)
+
+
+def has_table(html):
+    """Billigt tjek: har siden overhovedet en <table>?"""
+    return _TABLE_START.search(html) is not None
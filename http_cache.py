@@ -0,0 +1,143 @@
+"""
+Valgfri disk-cache til scraper_utils.fetch.
+
+Slås til ved at sætte SCRAPER_CACHE_DIR (fx SCRAPER_CACHE_DIR=.cache/http).
+Uden den variabel er cachen slået fra, og fetch opfører sig som før.
+
+- Nøgle: URL'en. Gemmes i en lille SQLite-fil med zlib-komprimeret HTML,
+  statuskode og hentetidspunkt.
+- Hver URL-type har sin egen levetid (TTL): ranking-sider nogle timer,
+  startlister et par dage. Se TTL_RULES.
+- Cachen holdes under SCRAPER_CACHE_MAX_MB (standard 200 MB); de mindst
+  nyligt brugte sider smides ud først (LRU).
+- Træffere/bom tælles og udskrives når scriptet slutter.
+
+Praktisk ved lokal fejlsøgning og ved genkørsel samme dag efter fx en
+fejlet skrivning til Google Sheets.
+"""
+
+import os
+import re
+import time
+import zlib
+import atexit
+import sqlite3
+import threading
+
+CACHE_DIR = os.environ.get("SCRAPER_CACHE_DIR", "").strip()
+CACHE_MAX_BYTES = int(float(os.environ.get("SCRAPER_CACHE_MAX_MB", "200")) * 1024 * 1024)
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+# (mønster, levetid i sekunder) - første match vinder
+TTL_RULES = [
+    (re.compile(r"procyclingstats\.com/rankings\.php"), 6 * HOUR),
+    (re.compile(r"procyclingstats\.com/race/.+/startlist"), 2 * DAY),
+    (re.compile(r"cykelkalenderen\.dk/loebskalender"), 6 * HOUR),
+    (re.compile(r"cykelkalenderen\.dk/loeb/"), 1 * DAY),
+]
+DEFAULT_TTL = 1 * HOUR
+
+
+def ttl_for(url):
+    for pattern, ttl in TTL_RULES:
+        if pattern.search(url):
+            return ttl
+    return DEFAULT_TTL
+
+
+class ResponseCache:
+    """URL -> (html, status) med TTL pr. URL-type og LRU-oprydning."""
+
+    def __init__(self, directory, max_bytes=CACHE_MAX_BYTES):
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, "responses.sqlite3")
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " url TEXT PRIMARY KEY, body BLOB NOT NULL, status INTEGER NOT NULL,"
+            " fetched_at REAL NOT NULL, last_access REAL NOT NULL, size INTEGER NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_lru ON responses (last_access)")
+        self._db.commit()
+
+    def get(self, url):
+        """Returnerer (html, status) hvis URL'en er i cachen og ikke udløbet, ellers None."""
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT body, status, fetched_at FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+            if row is None or now - row[2] > ttl_for(url):
+                self.misses += 1
+                return None
+            self._db.execute("UPDATE responses SET last_access = ? WHERE url = ?", (now, url))
+            self._db.commit()
+            self.hits += 1
+        return zlib.decompress(row[0]).decode("utf-8"), row[1]
+
+    def put(self, url, html, status):
+        body = zlib.compress(html.encode("utf-8"), 6)
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (url, body, status, fetched_at, last_access, size)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (url, body, status, now, now, len(body)),
+            )
+            self.stores += 1
+            self._evict()
+            self._db.commit()
+
+    def _evict(self):
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for url, size in self._db.execute(
+            "SELECT url, size FROM responses ORDER BY last_access ASC"
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            self._db.execute("DELETE FROM responses WHERE url = ?", (url,))
+            total -= size
+            self.evictions += 1
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "evictions": self.evictions,
+        }
+
+    def report(self):
+        if self.hits or self.misses:
+            print(f"🗄️  HTTP-cache: {self.hits} træffere, {self.misses} bom, "
+                  f"{self.stores} gemt, {self.evictions} smidt ud ({self.path})")
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def _open_cache():
+    if not CACHE_DIR:
+        return None
+    try:
+        c = ResponseCache(CACHE_DIR)
+    except Exception as e:
+        print(f"   Kunne ikke åbne HTTP-cache i {CACHE_DIR}: {e}")
+        return None
+    atexit.register(c.close)
+    atexit.register(c.report)
+    return c
+
+
+CACHE = _open_cache()
@@ -0,0 +1,200 @@
+"""
+Opslag af rytternavne uden at gennemløbe hele rankingen/startlisten.
+
+Arket og PCS skriver ikke altid navnene ens ("POGAČAR Tadej" vs. "Tadej Pogačar",
+ekstra mellemrum osv.). Reglerne var før to lineære gennemløb pr. rytter; her
+bygges indekset én gang pr. kørsel, og hvert opslag er et par dict-opslag:
+
+1. præcis samme nøgle
+2. samme normaliserede navn (rider_key, se rider_names.py)
+3. samme første + sidste navneord, i vilkårlig rækkefølge
+
+Giver flere navne samme nøgle, vinder det første (som i det gamle gennemløb).
+
+Finder ingen af dem noget, kan get(..., approximate=True) prøve en tilnærmet
+match (TrigramMatcher): kandidater findes via fælles trigrammer, og den bedste
+accepteres kun hvis redigeringsafstanden er lille (RIDER_FUZZY_MAX_DISTANCE,
+standard 2) og ligheden høj nok (RIDER_FUZZY_MIN_SCORE, standard 0.88). Er to
+forskellige ryttere lige tætte, gættes der ikke. Alle tilnærmede match gemmes i
+index.approximate_hits, så de kan vises i loggen.
+"""
+
+import os
+from collections import Counter
+
+from rider_names import rider_key
+
+FUZZY_MAX_DISTANCE = int(os.environ.get("RIDER_FUZZY_MAX_DISTANCE", "2"))
+FUZZY_MIN_SCORE = float(os.environ.get("RIDER_FUZZY_MIN_SCORE", "0.88"))
+
+
+def _pair_key(parts):
+    # {fornavn, efternavn} uden rækkefølge; kun for navne med mindst to ord
+    if len(parts) < 2:
+        return None
+    a, b = parts[0], parts[-1]
+    return (a, b) if a <= b else (b, a)
+
+
+class NameIndex:
+    """navn -> værdi, med opslag efter reglerne ovenfor.
+
+        index = NameIndex(points_dict)               # {navn: point}
+        index.get("Tadej POGAČAR")                   # -> point eller None
+        NameIndex.of(startlist, normalize)           # {navn: True}, til "er med?"
+
+    Med aliases (en AliasStore, se rider_aliases.py) og target ("points" eller
+    "startlist") gælder rækkefølgen: manuelt alias, præcis nøgle, normaliseret
+    navn, bekræftet alias, omvendt rækkefølge, tilnærmet. Tilnærmede match
+    lægges til gennemsyn, og afviste bruges ikke.
+    """
+
+    def __init__(self, mapping, normalize=rider_key, aliases=None, target=None):
+        self.normalize = normalize
+        self.aliases = aliases if target is not None else None
+        self.target = target
+        self._exact = dict(mapping)
+        self._full = {}   # normaliseret navn -> første navn med den nøgle
+        self._pairs = {}  # {fornavn, efternavn} -> første navn
+        self._matcher = None
+        self.approximate_hits = []  # (søgt navn, fundet navn, lighed)
+        for name in self._exact:
+            n = normalize(name)
+            self._full.setdefault(n, name)
+            pair = _pair_key(n.split())
+            if pair is not None:
+                self._pairs.setdefault(pair, name)
+
+    @classmethod
+    def of(cls, names, normalize=rider_key, aliases=None, target=None):
+        """Indeks over en samling navne, hvor værdien blot er True."""
+        return cls(dict.fromkeys(names, True), normalize, aliases, target)
+
+    def get(self, name, default=None, approximate=False):
+        found = self.find(name, approximate)
+        return self._exact[found] if found is not None else default
+
+    def find(self, name, approximate=False):
+        """Navnet i indekset som `name` matcher, eller None."""
+        if self.aliases is not None:
+            found = self._alias(self.aliases.manual(name, self.target))
+            if found is not None:
+                return found
+        if name in self._exact:
+            return name
+        n = self.normalize(name)
+        if n in self._full:
+            return self._full[n]
+        if self.aliases is not None:
+            found = self._alias(self.aliases.get(name, self.target))
+            if found is not None:
+                return found
+        pair = _pair_key(n.split())
+        if pair is not None and pair in self._pairs:
+            return self._pairs[pair]
+        if approximate and not (self.aliases is not None and self.aliases.rejected(name, self.target)):
+            hit = self.closest(name)
+            if hit is not None:
+                if self.aliases is not None:
+                    self.aliases.propose(name, self.normalize(hit[0]), self.target, hit[1])
+                return hit[0]
+        return None
+
+    def _alias(self, key):
+        return self._full.get(key) if key is not None else None
+
+    def closest(self, name):
+        """(navn i indekset, lighed) for det tætteste navn, eller None.
+        Trigram-indekset bygges først ved første kald."""
+        if self._matcher is None:
+            self._matcher = TrigramMatcher(self._exact, self.normalize)
+        hit = self._matcher.match(name)
+        if hit is not None:
+            self.approximate_hits.append((name, hit[0], hit[1]))
+        return hit
+
+    def __contains__(self, name):
+        return self.find(name) is not None
+
+    def __len__(self):
+        return len(self._exact)
+
+
+# =============================================================================
+# Tilnærmet match
+# =============================================================================
+
+def _sorted_key(n):
+    # Ordene sorteres, så "TADEJ POGACAR" og "POGACAR TADEJ" sammenlignes ens
+    return " ".join(sorted(n.split()))
+
+
+def _trigrams(s):
+    s = f" {s} "
+    return {s[i:i + 3] for i in range(len(s) - 2)}
+
+
+def bounded_distance(a, b, limit):
+    """Levenshtein-afstand mellem a og b, eller limit + 1 hvis den er større."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1,
+                               previous[j - 1] + (ca != cb)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return min(previous[-1], limit + 1)
+
+
+class TrigramMatcher:
+    """Tætteste navn via trigram-kandidater + begrænset redigeringsafstand."""
+
+    CANDIDATES = 8  # flest fælles trigrammer -> afstand beregnes kun for disse
+
+    def __init__(self, names, normalize=rider_key,
+                 max_distance=FUZZY_MAX_DISTANCE, min_score=FUZZY_MIN_SCORE):
+        self.normalize = normalize
+        self.max_distance = max_distance
+        self.min_score = min_score
+        self._keys = []       # sorteret nøgle pr. indgang
+        self._names = []      # første navn med den nøgle
+        self._postings = {}   # trigram -> indgange
+        seen = set()
+        for name in names:
+            key = _sorted_key(normalize(name))
+            if key in seen:
+                continue
+            seen.add(key)
+            idx = len(self._keys)
+            self._keys.append(key)
+            self._names.append(name)
+            for gram in _trigrams(key):
+                self._postings.setdefault(gram, []).append(idx)
+
+    def match(self, name):
+        """(navn, lighed 0-1) eller None hvis intet er tæt nok eller to er lige tætte."""
+        key = _sorted_key(self.normalize(name))
+        if not key:
+            return None
+        shared = Counter()
+        for gram in _trigrams(key):
+            shared.update(self._postings.get(gram, ()))
+        scored = []
+        for idx, _ in shared.most_common(self.CANDIDATES):
+            other = self._keys[idx]
+            d = bounded_distance(key, other, self.max_distance)
+            if d <= self.max_distance:
+                scored.append((1 - d / max(len(key), len(other)), idx))
+        if not scored:
+            return None
+        scored.sort(reverse=True)
+        best, idx = scored[0]
+        if best < self.min_score:
+            return None
+        if len(scored) > 1 and scored[1][0] == best:
+            return None  # tvetydigt
+        return self._names[idx], best
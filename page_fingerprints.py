@@ -0,0 +1,95 @@
+"""
+Genbrug af parsede rækker for sider der ikke har ændret sig.
+
+De fleste ranking-sider efter de første par hundrede ryttere er ens fra dag
+til dag. Hver hentet side får et fingeraftryk (SHA-1 af tabel-HTML'en med
+normaliseret whitespace); har vi set samme aftryk før, bruges de gemte rækker
+i stedet for at parse siden med BeautifulSoup igen.
+
+Aftrykkene gemmes i en lille JSON-fil (standard .cache/ranking_pages.json).
+Filen skrives om efter hver kørsel med kun dagens sider, så den ikke vokser.
+"""
+
+import os
+import json
+import hashlib
+import threading
+
+
+def table_fingerprint(html):
+    """Aftryk af tabel-delen af siden (fra første <table til sidste </table>).
+    None hvis siden ikke har en tabel."""
+    lower = html.lower()
+    start = lower.find("<table")
+    end = lower.rfind("</table>")
+    if start < 0 or end < start:
+        return None
+    normalized = " ".join(html[start:end + len("</table>")].split())
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+
+class PageRowCache:
+    """fingeraftryk -> parsede rækker, med tæller for genbrugte sider. Trådsikker."""
+
+    def __init__(self, path, row_factory=list, version=""):
+        self.path = path
+        self.row_factory = row_factory  # gemt JSON-liste -> række (fx en NamedTuple)
+        self.version = version          # skift ved nyt rækkeformat, så gamle aftryk ignoreres
+        self.reused = 0
+        self.parsed = 0
+        self._lock = threading.Lock()
+        self._previous = self._load()
+        self._current = {}
+
+    def _load(self):
+        if not self.path:
+            return {}
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def rows_for(self, html, parse):
+        """Returnerer parse(html), men genbruger tidligere rækker hvis tabellen er uændret."""
+        fp, rows = self.lookup(html)
+        if rows is not None:
+            return rows
+        rows = parse(html)
+        self.store(fp, rows)
+        return rows
+
+    def lookup(self, html):
+        """(aftryk, gemte rækker eller None) - til kaldere der parser et andet sted."""
+        fp = table_fingerprint(html)
+        if fp is not None and self.version:
+            fp = f"{self.version}:{fp}"
+        if fp is not None:
+            with self._lock:
+                rows = self._current.get(fp, self._previous.get(fp))
+                if rows is not None:
+                    self._current[fp] = rows
+                    self.reused += 1
+                    return fp, [self.row_factory(r) for r in rows]
+        return fp, None
+
+    def store(self, fp, rows):
+        """Gem rækkerne for en side der lige er parset."""
+        with self._lock:
+            self.parsed += 1
+            if fp is not None and rows is not None:
+                self._current[fp] = rows
+
+    def save(self):
+        with self._lock:
+            current = dict(self._current)
+        if not self.path or not current:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(current, f, ensure_ascii=False)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f"   Kunne ikke gemme side-aftryk i {self.path}: {e}")
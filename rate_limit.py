@@ -0,0 +1,95 @@
+"""
+Fælles hastighedsbegrænser (token bucket) pr. værtsnavn.
+
+Erstatter de faste tilfældige pauser (random.uniform(...)) i scraperne: i stedet
+for altid at vente 2-5 sek. venter vi kun så længe det er nødvendigt for at holde
+en bestemt rate mod hver vært.
+
+- SCRAPER_RATE_PER_SEC (standard 1.0): forespørgsler pr. sekund pr. vært.
+- SCRAPER_RATE_BURST (standard 3): hvor mange der må sendes i træk uden pause.
+
+Svarer en vært 429/503, halveres dens rate (ned til MIN_RATE); hvert vellykket
+svar giver lidt af raten tilbage, indtil den konfigurerede rate er nået igen.
+"""
+
+import os
+import time
+import threading
+import urllib.parse
+
+DEFAULT_RATE = float(os.environ.get("SCRAPER_RATE_PER_SEC", "1.0"))
+DEFAULT_BURST = max(1.0, float(os.environ.get("SCRAPER_RATE_BURST", "3")))
+MIN_RATE = 0.05          # aldrig langsommere end én forespørgsel pr. 20 sek.
+SLOWDOWN_STATUSES = (429, 503)
+RECOVERY_STEP = 0.1      # andel af den fulde rate der gives tilbage pr. succes
+
+
+def host_of(url):
+    return urllib.parse.urlsplit(url).hostname or ""
+
+
+class _Bucket:
+    def __init__(self, rate, burst):
+        self.base_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+
+class HostRateLimiter:
+    """Token bucket pr. vært. reserve() er trådsikker og returnerer hvor længe
+    kalderen skal vente, så den kan bruges både med time.sleep og asyncio.sleep."""
+
+    def __init__(self, rate=DEFAULT_RATE, burst=DEFAULT_BURST):
+        self.rate = rate
+        self.burst = burst
+        self.waited = 0.0
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, host):
+        b = self._buckets.get(host)
+        if b is None:
+            b = self._buckets[host] = _Bucket(self.rate, self.burst)
+        return b
+
+    def reserve(self, url):
+        """Tag en billet for url's vært. Returnerer ventetid i sekunder (0 hvis ingen)."""
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            b = self._bucket(host_of(url))
+            now = time.monotonic()
+            b.tokens = min(b.burst, b.tokens + (now - b.updated) * b.rate)
+            b.updated = now
+            b.tokens -= 1
+            wait = max(0.0, -b.tokens / b.rate)
+            self.waited += wait
+            return wait
+
+    def record(self, url, status):
+        """Giv besked om svaret: 429/503 sænker raten, succes hæver den igen."""
+        if self.rate <= 0 or status is None:
+            return
+        with self._lock:
+            b = self._bucket(host_of(url))
+            if status in SLOWDOWN_STATUSES:
+                b.rate = max(MIN_RATE, b.rate / 2)
+                print(f"   ⏳ {host_of(url)} svarede {status} - sænker til {b.rate:.2f} req/s")
+            elif status < 400 and b.rate < b.base_rate:
+                b.rate = min(b.base_rate, b.rate + b.base_rate * RECOVERY_STEP)
+
+    def current_rate(self, url):
+        with self._lock:
+            return self._bucket(host_of(url)).rate
+
+
+LIMITER = HostRateLimiter()
+
+
+def throttle(url):
+    """Blokerende: vent til der er plads til endnu en forespørgsel mod url's vært."""
+    wait = LIMITER.reserve(url)
+    if wait > 0:
+        time.sleep(wait)
@@ -0,0 +1,141 @@
+"""
+Navne-aliaser: navn i arket -> rytterens nøgle i rankingen eller på startlisten.
+
+Aliaserne er delt op pr. mål ("points" = UCI-rankingen, "startlist" = TDF-
+startlisten), så et match fundet mod det ene aldrig bruges mod det andet.
+Navne der kun afviger i accenter/rækkefølge finder name_index.py selv hver
+gang; aliaser er til dem, reglerne ikke kan afgøre sikkert.
+
+- Manuelle aliaser i rider_aliases.json (ligger i repoet, MANUAL_ALIAS_FILE).
+  De slås op først og vinder over alt andet. Værdien er navnet som det står i
+  rankingen/på startlisten; "*" gælder for begge mål:
+
+      {"points":    {"VLASOV Alexandr": "VLASOV Aleksandr"},
+       "startlist": {},
+       "*":         {}}
+
+- Tilnærmede match til gennemsyn (RIDER_ALIAS_FILE, standard
+  .cache/rider_aliases.json). Hvert tilnærmet match skrives under "review" med
+  "confirmed": null og huskes fra kørsel til kørsel. Sættes "confirmed" til
+  true, bruges det som alias (efter et præcist eller normaliseret match); sættes
+  det til false, bruges gættet ikke længere. Da filen i workflowet kun ligger i
+  cachen, er den varige rettelse at flytte aliaset over i rider_aliases.json.
+"""
+
+import os
+import json
+import atexit
+import threading
+from datetime import date
+
+from rider_names import rider_key
+
+MANUAL_ALIAS_FILE = os.environ.get("MANUAL_ALIAS_FILE", "rider_aliases.json").strip()
+ALIAS_FILE = os.environ.get("RIDER_ALIAS_FILE", ".cache/rider_aliases.json").strip()
+ANY_TARGET = "*"
+
+
+def _read_json(path):
+    if not path:
+        return {}
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+class AliasStore:
+    """Manuelle aliaser og gennemsete tilnærmede match pr. mål. Trådsikker."""
+
+    def __init__(self, path=ALIAS_FILE, manual_path=MANUAL_ALIAS_FILE):
+        self.path = path
+        self.manual_path = manual_path
+        self.hits = 0
+        self.proposed = 0
+        self._lock = threading.Lock()
+        self._manual = self._load_manual()
+        review = _read_json(path).get("review")
+        # Filer i et ældre format (uden "review" pr. mål) ignoreres
+        self._review = {target: dict(entries) for target, entries in review.items()
+                        if isinstance(entries, dict)} if isinstance(review, dict) else {}
+        self._dirty = False
+
+    def _load_manual(self):
+        manual = {}
+        for target, aliases in _read_json(self.manual_path).items():
+            if isinstance(aliases, dict):
+                manual[target] = {rider_key(name): rider_key(canonical)
+                                  for name, canonical in aliases.items()}
+        return manual
+
+    def manual(self, name, target):
+        """Nøglen fra rider_aliases.json, eller None."""
+        alias = rider_key(name)
+        for scope in (target, ANY_TARGET):
+            key = self._manual.get(scope, {}).get(alias)
+            if key is not None:
+                self._hit()
+                return key
+        return None
+
+    def _entry(self, name, target):
+        with self._lock:
+            return self._review.get(target, {}).get(rider_key(name))
+
+    def get(self, name, target):
+        """Nøglen fra et bekræftet tilnærmet match ("confirmed": true), eller None."""
+        entry = self._entry(name, target)
+        if entry is None or entry.get("confirmed") is not True:
+            return None
+        self._hit()
+        return entry.get("key")
+
+    def rejected(self, name, target):
+        """Er det tilnærmede match for navnet afvist ("confirmed": false)?"""
+        entry = self._entry(name, target)
+        return entry is not None and entry.get("confirmed") is False
+
+    def _hit(self):
+        with self._lock:
+            self.hits += 1
+
+    def propose(self, name, key, target, score):
+        """Læg et tilnærmet match til gennemsyn. Et allerede gennemset forslag
+        med samme nøgle beholder sin afgørelse."""
+        alias = rider_key(name)
+        today = date.today().isoformat()
+        with self._lock:
+            entries = self._review.setdefault(target, {})
+            entry = entries.get(alias)
+            if entry is None or entry.get("key") != key:
+                entry = entries[alias] = {"name": name, "key": key, "confirmed": None,
+                                          "first_seen": today}
+                self.proposed += 1
+            entry.update(score=round(score, 3), last_seen=today)
+            self._dirty = True
+
+    def __len__(self):
+        with self._lock:
+            return sum(1 for entries in self._review.values() for e in entries.values()
+                       if e.get("confirmed") is True)
+
+    def save(self):
+        with self._lock:
+            if not self._dirty or not self.path:
+                return
+            data = {"review": self._review}
+            self._dirty = False
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=2, sort_keys=True)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f"   Kunne ikke gemme aliaser i {self.path}: {e}")
+
+
+ALIASES = AliasStore()
+atexit.register(ALIASES.save)
@@ -0,0 +1,91 @@
+"""
+Fælles normalisering af rytternavne (scrapere + frontend).
+
+Samme navn staves forskelligt i arket, hos PCS og i filnavnene på rytterbillederne
+("KÜNG Stefan", "KUNG Stefan", "O'CONNOR Ben"). Alle steder bruger nu de samme to
+funktioner, og resultaterne huskes, så Unicode-nedbrydningen kun laves én gang
+pr. navn pr. kørsel:
+
+- file_name(name): accenter/apostroffer fjernet, ø/å/æ omskrevet, store og små
+  bogstaver bevaret - præcis som normalizeForFile i frontend/src/App.js
+  ("VAUQUELIN Kévin" -> "VAUQUELIN Kevin", billedet hedder "VAUQUELIN Kevin.webp").
+- rider_key(name): den stabile nøgle til sammenligning - file_name med ét
+  mellemrum mellem ordene og store bogstaver ("VAUQUELIN KEVIN").
+
+Frontenden slår filnavnene op i en færdigberegnet tabel i stedet for at
+normalisere ved hver visning:
+
+    python rider_names.py          # skriv frontend/src/riderKeys.json ud fra App.js
+"""
+
+import os
+import re
+import sys
+import json
+import unicodedata
+from functools import lru_cache
+
+APP_JS = os.path.join("frontend", "src", "App.js")
+KEY_MAP_FILE = os.path.join("frontend", "src", "riderKeys.json")
+
+# Nordiske bogstaver som NFD ikke nedbryder
+_LETTERS = str.maketrans({"ø": "o", "Ø": "O", "å": "a", "Å": "A", "æ": "ae", "Æ": "AE",
+                          "'": None, "‘": None, "’": None})
+
+
+@lru_cache(maxsize=8192)
+def file_name(name):
+    """Navnet uden accenter og apostroffer (store/små bogstaver bevares)."""
+    s = unicodedata.normalize("NFD", str(name))
+    s = "".join(c for c in s if unicodedata.category(c) != "Mn")
+    return s.translate(_LETTERS)
+
+
+@lru_cache(maxsize=8192)
+def rider_key(name):
+    """Stabil sammenligningsnøgle: 'Tadej  Pogačar' -> 'TADEJ POGACAR'."""
+    return " ".join(file_name(name).split()).upper()
+
+
+# =============================================================================
+# Nøgletabel til frontenden
+# =============================================================================
+
+_BLOCK = r"const {name} = \{{(.*?)\n\}};"
+_QUOTED = re.compile(r'"([^"]+)"')
+
+
+def frontend_names(app_js=APP_JS):
+    """Alle rytternavne i App.js (holdene i TEAMS og nøglerne i RIDER_COSTS)."""
+    with open(app_js, encoding="utf-8") as f:
+        source = f.read()
+    names = set()
+    costs = re.search(_BLOCK.format(name="RIDER_COSTS"), source, re.DOTALL)
+    if costs:
+        names.update(re.findall(r'"([^"]+)"\s*:', costs.group(1)))
+    teams = re.search(_BLOCK.format(name="TEAMS"), source, re.DOTALL)
+    if teams:
+        for roster in re.findall(r"\[(.*?)\]", teams.group(1), re.DOTALL):
+            names.update(_QUOTED.findall(roster))
+    return sorted(names)
+
+
+def key_map(names):
+    """{'files': {navn: filnavn uden .webp}, 'keys': {navn: rider_key}}"""
+    return {
+        "files": {n: file_name(n) for n in names},
+        "keys": {n: rider_key(n) for n in names},
+    }
+
+
+def write_key_map(path=KEY_MAP_FILE, app_js=APP_JS):
+    names = frontend_names(app_js)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(key_map(names), f, ensure_ascii=False, indent=2, sort_keys=True)
+        f.write("\n")
+    print(f"💾 {len(names)} rytternavne skrevet til {path}")
+    return names
+
+
+if __name__ == "__main__":
+    write_key_map(*sys.argv[1:2])
@@ -13,23 +13,21 @@ Defensiv:
 
 import re
 import sys
-import time
-import random
 from datetime import datetime
 
-import cloudscraper
-from bs4 import BeautifulSoup
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
-
 from scraper_utils import fetch  # FlareSolverr (primær) + cloudscraper (backup)
-
-# Samme opsætning som point-scriptet
-CREDENTIALS_FILE = 'cycling-fantasy-485220-faab21c57cd1.json'
-SHEET_NAME = 'Cycling Fantasy 2026'
+from html_parsing import make_soup  # lxml hvis installeret, ellers html.parser
+from name_index import NameIndex  # navneopslag uden lineære gennemløb
+from rider_names import rider_key  # fælles navnenøgle (også brugt af frontenden)
+from rider_aliases import ALIASES  # manuelle og gennemsete navne-aliaser
+import sheets  # fælles login + regneark åbnet på nøglen
+from sheet_writes import changed_cells, plan_writes, report as report_writes
+
+# Samme faneblad som point-scriptet
 WORKSHEET_NAME = 'Points'
 
 TDF_COLUMN = 'D'                 # kolonne hvor "TDF" skrives
+TDF_COLUMN_NUMBER = 4
 MIN_RIDERS_TO_TRUST = 50         # under dette antal regnes startlisten som "ikke klar"
 
 
@@ -44,7 +42,14 @@ def scrape_startlist(year):
         print(f"❌ HTTP {status} - kunne ikke hente startliste")
         return []
 
-    soup = BeautifulSoup(html, 'html.parser')
+    names = parse_startlist(html)
+    print(f"✅ Fandt {len(names)} ryttere på startlisten")
+    return names
+
+
+def parse_startlist(html, parser=None):
+    """Udtræk 'EFTERNAVN Fornavn'-navne fra startliste-HTML (i sidens rækkefølge)."""
+    soup = make_soup(html, parser)
 
     names = []
     seen = set()
@@ -63,35 +68,21 @@ def scrape_startlist(year):
         if text not in seen:
             seen.add(text)
             names.append(text)
-
-    print(f"✅ Fandt {len(names)} ryttere på startlisten")
     return names
 
 
 def normalize(name):
     """Til sammenligning: store bogstaver, ét mellemrum, accenter/apostroffer fjernet."""
-    import unicodedata
-    s = unicodedata.normalize('NFD', str(name))
-    s = ''.join(c for c in s if unicodedata.category(c) != 'Mn')
-    s = s.replace('ø', 'o').replace('Ø', 'O').replace('å', 'a').replace('Å', 'A')
-    s = s.replace('æ', 'ae').replace('Æ', 'AE')
-    for q in ("'", '‘', '’'):
-        s = s.replace(q, '')
-    return ' '.join(s.split()).upper()
+    return rider_key(name)
 
 
 def is_on_startlist(rider_name, startlist_norm):
-    n = normalize(rider_name)
-    if n in startlist_norm:
-        return True
-    # match på for- + efternavn (rækkefølge kan variere)
-    parts = n.split()
-    if len(parts) >= 2:
-        for sn in startlist_norm:
-            sp = sn.split()
-            if len(sp) >= 2 and {sp[0], sp[-1]} == {parts[0], parts[-1]}:
-                return True
-    return False
+    """startlist_norm: NameIndex over startlisten (byg den én gang), eller et sæt
+    af normaliserede navne. Match på fuldt navn eller for- + efternavn i vilkårlig
+    rækkefølge, og ellers tilnærmet (se name_index.py)."""
+    if not isinstance(startlist_norm, NameIndex):
+        startlist_norm = NameIndex.of(startlist_norm, normalize)
+    return startlist_norm.get(rider_name, False, approximate=True)
 
 
 def main():
@@ -107,19 +98,16 @@ def main():
               f"offentliggjort endnu. Rører ikke arket.")
         return
 
-    startlist_norm = {normalize(n) for n in startlist}
+    startlist_norm = NameIndex.of(startlist, normalize, aliases=ALIASES, target="startlist")
 
     try:
-        scope = ['https://spreadsheets.google.com/feeds',
-                 'https://www.googleapis.com/auth/drive']
-        creds = ServiceAccountCredentials.from_json_keyfile_name(CREDENTIALS_FILE, scope)
-        sheet = gspread.authorize(creds).open(SHEET_NAME).worksheet(WORKSHEET_NAME)
+        sheet = sheets.worksheet(WORKSHEET_NAME)
         rows = sheet.get_all_values()
     except Exception as e:
         print(f"⚠️  Kunne ikke forbinde til Google Sheet: {e}")
         return
 
-    updates = []
+    wanted = {}
     selected = 0
     for i, row in enumerate(rows[1:], start=2):  # spring header over
         if not row or not row[0].strip():
@@ -128,14 +116,22 @@ def main():
         mark = 'TDF' if is_on_startlist(rider, startlist_norm) else ''
         if mark:
             selected += 1
-        updates.append({'range': f'{TDF_COLUMN}{i}', 'values': [[mark]]})
+        wanted[(i, TDF_COLUMN_NUMBER)] = mark
+
+    for name, match, score in startlist_norm.approximate_hits:
+        print(f"🔎 {name} ≈ {match} på startlisten ({score:.0%})")
 
+    # Kun rækker hvor markeringen har ændret sig, skrives
+    changed = changed_cells(rows, wanted)
+    updates = plan_writes(rows, changed, wanted)
+    report_writes(len(changed), len(wanted) - len(changed), updates)
     if updates:
-        try:
-            sheet.batch_update(updates)
+        if sheets.write(sheet, updates):
             print(f"✅ Opdateret kolonne {TDF_COLUMN}: {selected} ryttere markeret som TDF")
-        except Exception as e:
-            print(f"⚠️  Kunne ikke skrive til arket: {e}")
+        else:
+            print("⚠️  Kunne ikke skrive til arket")
+    else:
+        print(f"✅ Kolonne {TDF_COLUMN} er allerede opdateret ({selected} ryttere markeret som TDF)")
 
 
 if __name__ == '__main__':
@@ -3,37 +3,80 @@ WORKING CYKELKALENDEREN.DK SCRAPER
 Parser RAW HTML for at finde "X danskere til start"
 """
 
-import cloudscraper
-from bs4 import BeautifulSoup
-import time
-import random
 from datetime import datetime, timedelta
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
 import re
 
+from html_parsing import make_soup  # lxml hvis installeret, ellers html.parser
+from rate_limit import LIMITER, throttle  # fælles hastighedsbegrænser pr. vært
+import sheets  # fælles login + regneark åbnet på nøglen
+
 # =============================================================================
 # KONFIGURATION  
 # =============================================================================
 
-CREDENTIALS_FILE = 'cycling-fantasy-485220-faab21c57cd1.json'
-SHEET_NAME = 'Cycling Fantasy 2026'
 WORKSHEET_NAME = 'Kommende Løb'
 
 # =============================================================================
 # FUNKTIONER
 # =============================================================================
 
-def get_danish_riders_from_race(race_url, race_name):
-    """Hent danske ryttere fra løbets side på cykelkalenderen.dk"""
+def parse_race_riders(html, parser=None):
+    """Find danske rytternavne på en løbsside (HTML). Højst 20 navne."""
+    soup = make_soup(html, parser)
+    
+    danish_riders = []
+    
+    # Find DK flag billeder
+    dk_flags = soup.find_all('img', src=lambda x: x and 'dk.png' in x.lower())
+    
+    for flag in dk_flags:
+        parent = flag.find_parent(['tr', 'td', 'div', 'li', 'p', 'span'])
+        if parent:
+            # Find rytter link (bedste metode)
+            rider_link = parent.find('a', href=lambda x: x and '/rytter/' in x)
+            if rider_link:
+                rider_name = rider_link.get_text(strip=True)
+                if rider_name and len(rider_name) > 3 and rider_name not in danish_riders:
+                    danish_riders.append(rider_name)
+            else:
+                # Backup: Parse text manuelt
+                text = parent.get_text(strip=True)
+                # Format kan være:
+                # "Kristian EgholmLidl - Trek (WT)"
+                # "Sebastian Kolze ChangiziTudor Pro Cycling Team (PRT)"
+                
+                # Find rytter navn (stopper ved holdnavn)
+                # Holdnavne starter typisk med stort bogstav + flere store bogstaver eller " - " eller "("
+                # Rytter navne har mellemrum mellem ord
+                
+                # Split ved første forekomst af enten:
+                # - To store bogstaver i træk (UAErTeam)
+                # - " - " (Lidl - Trek)
+                # - "(" (Tudor (PRT))
+                parts = re.split(r'(?=[A-ZÆØÅ]{2,})|(?=\s+-\s+)|(?=\()', text, maxsplit=1)
+                if parts:
+                    rider_name = parts[0].strip()
+                    # Tjek at det ligner et navn (har mindst 2 ord med mellemrum)
+                    if ' ' in rider_name and len(rider_name) > 5 and rider_name not in danish_riders:
+                        danish_riders.append(rider_name)
     
-    scraper = cloudscraper.create_scraper(
+    return danish_riders[:20]
+
+def _new_scraper():
+    # cloudscraper importeres først når der skal hentes (se bench_startup.py)
+    import cloudscraper
+    return cloudscraper.create_scraper(
         browser={
             'browser': 'chrome',
             'platform': 'darwin',
             'mobile': False
         }
     )
+
+def get_danish_riders_from_race(race_url, race_name):
+    """Hent danske ryttere fra løbets side på cykelkalenderen.dk"""
+    
+    scraper = _new_scraper()
     
     headers = {
         'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15'
@@ -41,54 +84,106 @@ def get_danish_riders_from_race(race_url, race_name):
     scraper.headers.update(headers)
     
     try:
-        time.sleep(random.uniform(1, 2))
+        throttle(race_url)
         response = scraper.get(race_url, timeout=30)
+        LIMITER.record(race_url, response.status_code)
         
         if response.status_code != 200:
             return []
         
-        soup = BeautifulSoup(response.text, 'html.parser')
+        return parse_race_riders(response.text)
+        
+    except Exception as e:
+        return []
+
+def _is_skipped_race(race_text):
+    """SKIP kvindeløb, cyklecross og bane"""
+    race_text_lower = race_text.lower()
+    return any([
+        '[K]' in race_text,
+        'cyklecross' in race_text_lower,
+        'cyclocross' in race_text_lower,
+        'cykelcross' in race_text_lower,
+        'bane' in race_text_lower,
+        'track' in race_text_lower,
+        'vm i cyklecross' in race_text_lower
+    ])
+
+def parse_calendar(html, today, parser=None):
+    """Parse kalendersiden. Returnerer
+    [(race_date, [(race_text, race_name_simple, href, danish_count), ...])]
+    for dage i de næste 7 dage, i sidens rækkefølge. Kvindeløb, cross og bane er sorteret fra."""
+    next_week = today + timedelta(days=7)
+    soup = make_soup(html, parser)
+    days = []
+    
+    # Find alle rows i kalenderen
+    table_rows = soup.find_all('tr')
+    
+    for row in table_rows:
+        cells = row.find_all('td')
+        if len(cells) < 2:
+            continue
+        
+        # Første celle = dato
+        date_cell = cells[0]
+        date_text = date_cell.get_text(strip=True)
         
-        danish_riders = []
+        # Parse dato
+        date_match = re.search(r'd\. (\d+)/(\d+)', date_text)
+        if not date_match:
+            continue
         
-        # Find DK flag billeder
-        dk_flags = soup.find_all('img', src=lambda x: x and 'dk.png' in x.lower())
+        day = int(date_match.group(1))
+        month = int(date_match.group(2))
+        year = today.year
         
-        for flag in dk_flags:
-            parent = flag.find_parent(['tr', 'td', 'div', 'li', 'p', 'span'])
-            if parent:
-                # Find rytter link (bedste metode)
-                rider_link = parent.find('a', href=lambda x: x and '/rytter/' in x)
-                if rider_link:
-                    rider_name = rider_link.get_text(strip=True)
-                    if rider_name and len(rider_name) > 3 and rider_name not in danish_riders:
-                        danish_riders.append(rider_name)
-                else:
-                    # Backup: Parse text manuelt
-                    text = parent.get_text(strip=True)
-                    # Format kan være:
-                    # "Kristian EgholmLidl - Trek (WT)"
-                    # "Sebastian Kolze ChangiziTudor Pro Cycling Team (PRT)"
-                    
-                    # Find rytter navn (stopper ved holdnavn)
-                    # Holdnavne starter typisk med stort bogstav + flere store bogstaver eller " - " eller "("
-                    # Rytter navne har mellemrum mellem ord
-                    
-                    # Split ved første forekomst af enten:
-                    # - To store bogstaver i træk (UAErTeam)
-                    # - " - " (Lidl - Trek)
-                    # - "(" (Tudor (PRT))
-                    parts = re.split(r'(?=[A-ZÆØÅ]{2,})|(?=\s+-\s+)|(?=\()', text, maxsplit=1)
-                    if parts:
-                        rider_name = parts[0].strip()
-                        # Tjek at det ligner et navn (har mindst 2 ord med mellemrum)
-                        if ' ' in rider_name and len(rider_name) > 5 and rider_name not in danish_riders:
-                            danish_riders.append(rider_name)
+        try:
+            race_date = datetime(year, month, day)
+        except:
+            continue
         
-        return danish_riders[:20]
+        # Kun løb i de næste 7 dage
+        if not (today.date() <= race_date.date() <= next_week.date()):
+            continue
         
-    except Exception as e:
-        return []
+        # Anden celle = løb - få RAW HTML
+        races_cell = cells[1]
+        cell_html = str(races_cell)
+        
+        day_races = []
+        
+        # Find alle løb links
+        race_links = races_cell.find_all('a', href=lambda x: x and '/loeb/' in x)
+        
+        for link in race_links:
+            race_text = link.get_text(strip=True)
+            if _is_skipped_race(race_text):
+                continue
+            
+            # Ekstraher race navn
+            race_name_simple = re.sub(r'\s*-\s*\d+\.\s*etape.*', '', race_text).strip()
+            race_name_short = race_name_simple.split('[')[0].strip()
+            
+            # Søg i RAW HTML efter: ">4 danskere til start i AlUla Tour"
+            # Flere mønstre
+            patterns = [
+                rf'>(\d+)\s+danskere?\s+til\s+start\s+i\s+{re.escape(race_name_short)}',
+                rf'(\d+)\s+danskere?\s+til\s+start\s+i\s+{re.escape(race_name_short)}',
+            ]
+            
+            danish_count = 0
+            for pattern in patterns:
+                danish_match = re.search(pattern, cell_html, re.IGNORECASE)
+                if danish_match:
+                    danish_count = int(danish_match.group(1))
+                    break
+            
+            day_races.append((race_text, race_name_simple, link.get('href', ''), danish_count))
+        
+        days.append((race_date, day_races))
+    
+    return days
 
 def scrape_cykelkalenderen():
     """Hent kommende løb fra Cykelkalenderen.dk"""
@@ -96,13 +191,7 @@ def scrape_cykelkalenderen():
     print("🚴 HENTER KOMMENDE LØB FRA CYKELKALENDEREN.DK")
     print("=" * 70)
     
-    scraper = cloudscraper.create_scraper(
-        browser={
-            'browser': 'chrome',
-            'platform': 'darwin',
-            'mobile': False
-        }
-    )
+    scraper = _new_scraper()
     
     headers = {
         'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15'
@@ -110,7 +199,6 @@ def scrape_cykelkalenderen():
     scraper.headers.update(headers)
     
     today = datetime.now()
-    next_week = today + timedelta(days=7)
     
     races = []
     
@@ -120,101 +208,32 @@ def scrape_cykelkalenderen():
     print(f"\n📅 Henter {today.strftime('%B %Y')}...")
     
     try:
-        time.sleep(random.uniform(2, 4))
+        throttle(url)
         response = scraper.get(url, timeout=30)
+        LIMITER.record(url, response.status_code)
         
         if response.status_code != 200:
             print(f"❌ HTTP {response.status_code}")
             return []
         
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Find alle rows i kalenderen
-        table_rows = soup.find_all('tr')
-        
-        for row in table_rows:
-            cells = row.find_all('td')
-            if len(cells) < 2:
-                continue
-            
-            # Første celle = dato
-            date_cell = cells[0]
-            date_text = date_cell.get_text(strip=True)
-            
-            # Parse dato
-            date_match = re.search(r'd\. (\d+)/(\d+)', date_text)
-            if not date_match:
-                continue
-            
-            day = int(date_match.group(1))
-            month = int(date_match.group(2))
-            year = today.year
-            
-            try:
-                race_date = datetime(year, month, day)
-            except:
-                continue
-            
-            # Kun løb i de næste 7 dage
-            if not (today.date() <= race_date.date() <= next_week.date()):
-                continue
-            
-            # Anden celle = løb - få RAW HTML
-            races_cell = cells[1]
-            cell_html = str(races_cell)
-            
+        for race_date, day_races in parse_calendar(response.text, today):
             print(f"\n   📅 {race_date.strftime('%d.%m')}:")
             
-            # Find alle løb links
-            race_links = races_cell.find_all('a', href=lambda x: x and '/loeb/' in x)
-            
-            for link in race_links:
-                race_text = link.get_text(strip=True)
-                race_text_lower = race_text.lower()
-                
-                # SKIP kvindeløb, cyklecross og bane
-                if any([
-                    '[K]' in race_text,
-                    'cyklecross' in race_text_lower,
-                    'cyclocross' in race_text_lower,
-                    'cykelcross' in race_text_lower,
-                    'bane' in race_text_lower,
-                    'track' in race_text_lower,
-                    'vm i cyklecross' in race_text_lower
-                ]):
-                    continue
-                
+            for race_text, race_name_simple, href, danish_count in day_races:
                 # Inkluder alle andre landevejsløb
                 print(f"      🚴 {race_text[:60]}")
                 
-                # Ekstraher race navn
-                race_name_simple = re.sub(r'\s*-\s*\d+\.\s*etape.*', '', race_text).strip()
-                race_name_short = race_name_simple.split('[')[0].strip()
-                
-                # Søg i RAW HTML efter: ">4 danskere til start i AlUla Tour"
-                # Flere mønstre
-                patterns = [
-                    rf'>(\d+)\s+danskere?\s+til\s+start\s+i\s+{re.escape(race_name_short)}',
-                    rf'(\d+)\s+danskere?\s+til\s+start\s+i\s+{re.escape(race_name_short)}',
-                ]
-                
-                danish_count = 0
-                for pattern in patterns:
-                    danish_match = re.search(pattern, cell_html, re.IGNORECASE)
-                    if danish_match:
-                        danish_count = int(danish_match.group(1))
-                        print(f"         ✅ {danish_count} danskere!")
-                        break
-                
-                # Hvis ingen danskere fundet, tjek om det er et mænds landevejsløb
-                if danish_count == 0:
+                if danish_count > 0:
+                    print(f"         ✅ {danish_count} danskere!")
+                else:
+                    # Hvis ingen danskere fundet, tjek om det er et mænds landevejsløb
                     print(f"         ℹ️  Ingen danskere")
                 
                 # Hent danske ryttere navne hvis der er nogen
                 danish_riders = []
                 if danish_count > 0:
                     print(f"         🔍 Henter {danish_count} danske navne...", end=" ", flush=True)
-                    race_url = 'https://cykelkalenderen.dk' + link.get('href', '')
+                    race_url = 'https://cykelkalenderen.dk' + href
                     danish_riders = get_danish_riders_from_race(race_url, race_name_simple)
                     if danish_riders:
                         print(f"✅ Fundet {len(danish_riders)} navne:")
@@ -229,7 +248,7 @@ def scrape_cykelkalenderen():
                     'date': race_date,
                     'danish_count': danish_count,
                     'danish_riders': danish_riders,
-                    'url': 'https://cykelkalenderen.dk' + link.get('href', '')
+                    'url': 'https://cykelkalenderen.dk' + href
                 })
         
         print(f"\n✅ Fundet {len(races)} løb")
@@ -274,25 +293,9 @@ def save_to_google_sheets(races):
     print("=" * 70)
     
     try:
-        # Forbind til Google Sheets
-        scope = [
-            'https://spreadsheets.google.com/feeds',
-            'https://www.googleapis.com/auth/drive'
-        ]
-        creds = ServiceAccountCredentials.from_json_keyfile_name(
-            CREDENTIALS_FILE, scope
-        )
-        client = gspread.authorize(creds)
-        
-        # Åbn spreadsheet
-        spreadsheet = client.open(SHEET_NAME)
-        
-        # Tjek om worksheet eksisterer, ellers opret
-        try:
-            sheet = spreadsheet.worksheet(WORKSHEET_NAME)
-            sheet.clear()
-        except:
-            sheet = spreadsheet.add_worksheet(title=WORKSHEET_NAME, rows=100, cols=4)
+        # Forbind til Google Sheets (fælles login, se sheets.py); opret fanebladet hvis det mangler
+        sheet = sheets.worksheet(WORKSHEET_NAME, rows=100, cols=4)
+        sheets.clear(sheet)
         
         print(f"✅ Forbundet til Google Sheets")
         
@@ -315,8 +318,10 @@ def save_to_google_sheets(races):
                 datetime.now().strftime('%Y-%m-%d %H:%M')
             ])
         
-        # Skriv til sheet
-        sheet.update(range_name='A1', values=data)
+        # Skriv til sheet (via skrive-køen, se sheets.py)
+        if not sheets.write(sheet, [{'range': 'A1', 'values': data}]):
+            print("❌ Fejl ved gemning")
+            return
         
         print(f"✅ Gemt {len(races)} løb til sheet")
         
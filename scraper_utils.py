@@ -14,6 +14,25 @@ Opsætning:
   - FLARESOLVERR_URL sættes i workflowet til http://localhost:8191/v1 (containeren).
     Lokalt kan du selv køre den med:  docker run -d -p 8191:8191 ghcr.io/flaresolverr/flaresolverr
   - Uden FLARESOLVERR_URL opfører alt sig som før (kun cloudscraper).
+  - SCRAPER_CACHE_DIR slår en disk-cache af svarene til (se http_cache.py).
+  - FLARESOLVERR_SESSIONS (standard 4) styrer hvor mange browser-sessioner der
+    holdes varme, så samtidige kald til fetch() ikke venter på hinanden.
+
+Ventetid mellem forespørgsler styres af rate_limit.LIMITER (SCRAPER_RATE_PER_SEC /
+SCRAPER_RATE_BURST pr. vært) i stedet for faste tilfældige pauser.
+
+Når FlareSolverr har løst udfordringen for en vært, hentes de næste sider derfra
+med almindelig requests og de samme cookies/User-Agent (hurtigt); kun hvis
+udfordringen dukker op igen, går vi tilbage til browseren.
+
+Metoder der fejler flere gange i træk springes over i en periode (circuit breaker,
+se circuit_breaker.py); tilstanden huskes til næste kørsel.
+
+Hvert kald måles (metode, forsøg, tid, bytes, ventetid) og skrives ved afslutning
+til SCRAPER_METRICS_DIR (se fetch_metrics.py).
+
+fetch_async()/fetch_many() er asynkrone udgaver til brug i ét event loop
+(med højst SCRAPER_HOST_CONCURRENCY samtidige hentninger pr. vært).
 
   (Valgfrit: hvis du en dag vil bruge en betalt scraping-API som ekstra backup,
    kan SCRAPER_API_KEY + SCRAPER_API_TEMPLATE sættes - bruges kun hvis FlareSolverr
@@ -22,12 +41,19 @@ Opsætning:
 
 import os
 import time
-import random
 import atexit
+import weakref
+import threading
+import contextlib
 import urllib.parse
 
 import requests
-import cloudscraper
+from requests.adapters import HTTPAdapter
+
+from http_cache import CACHE  # valgfri disk-cache (SCRAPER_CACHE_DIR)
+from circuit_breaker import BREAKERS  # springer metoder over der fejler gentagne gange
+from fetch_metrics import METRICS  # tid/forsøg/bytes pr. metode -> metrics/*.json + *.prom
+from rate_limit import LIMITER  # fælles token bucket pr. vært (i stedet for faste pauser)
 
 FLARESOLVERR_URL = os.environ.get("FLARESOLVERR_URL", "").strip()
 SCRAPER_API_KEY = os.environ.get("SCRAPER_API_KEY", "").strip()
@@ -36,12 +62,19 @@ SCRAPER_API_TEMPLATE = os.environ.get(
     "https://api.scraperapi.com/?api_key={key}&url={url}",
 )
 
+# Navne på metoderne i circuit breakeren (og i tilstandsfilen)
+TIER_CLEARANCE = "cookies"
+TIER_FLARESOLVERR = "flaresolverr"
+TIER_CLOUDSCRAPER = "cloudscraper"
+TIER_API = "scraping_api"
+
 _HEADERS = {
     "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15"
 }
 
 
 def _new_scraper():
+    import cloudscraper  # først når cloudscraper faktisk bruges (se bench_startup.py)
     s = cloudscraper.create_scraper(
         browser={"browser": "chrome", "platform": "darwin", "mobile": False}
     )
@@ -49,54 +82,281 @@ def _new_scraper():
     return s
 
 
-# FlareSolverr-session: løs Cloudflare-udfordringen ÉN gang og genbrug cookien
-# til alle efterfølgende sider. Det gør de næste hentninger næsten øjeblikkelige.
-_FS_SESSION = None
+# FlareSolverr-sessioner: løs Cloudflare-udfordringen én gang pr. session og genbrug
+# cookien til de efterfølgende sider. En pulje af sessioner (hver sin browser-fane)
+# lader flere tråde hente samtidig i stedet for at stå i kø bag én fane.
 MAX_TIMEOUT_MS = 120000  # FlareSolverr får op til 120 sek. til at løse en udfordring
+FS_POOL_SIZE = max(1, int(os.environ.get("FLARESOLVERR_SESSIONS", "4")))
+FS_HEALTH_CHECK_AFTER = 300  # sek. en session må ligge ubrugt før den tjekkes igen
 
 
-def _ensure_session():
-    global _FS_SESSION
-    if _FS_SESSION is not None:
-        return _FS_SESSION
-    try:
-        r = requests.post(FLARESOLVERR_URL, json={"cmd": "sessions.create"}, timeout=MAX_TIMEOUT_MS / 1000 + 30)
-        data = r.json()
-        if data.get("status") == "ok" and data.get("session"):
-            _FS_SESSION = data["session"]
-            print(f"   FlareSolverr-session oprettet ({str(_FS_SESSION)[:8]}…)")
-    except Exception as e:
-        print(f"   Kunne ikke oprette FlareSolverr-session: {e}")
-    return _FS_SESSION
-
-
-def _destroy_session():
-    global _FS_SESSION
-    if _FS_SESSION:
+class _SessionPool:
+    """Trådsikker pulje af FlareSolverr-sessioner.
+
+    Sessioner oprettes på forhånd med warm() (se warm_sessions, der kaldes før
+    ranking-siderne hentes) eller efter behov op til `size`, lånes ud med lease()
+    og gives tilbage bagefter. En session der fejlede eller ikke længere findes i
+    FlareSolverr, destrueres og erstattes af en ny.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self._idle = []                  # (session_id, tidspunkt for sidste brug), sidst brugte øverst
+        self._cond = threading.Condition()
+        self._created = 0
+        self._closed = False
+
+    def _create(self):
         try:
-            requests.post(FLARESOLVERR_URL, json={"cmd": "sessions.destroy", "session": _FS_SESSION}, timeout=30)
+            r = requests.post(FLARESOLVERR_URL, json={"cmd": "sessions.create"}, timeout=MAX_TIMEOUT_MS / 1000 + 30)
+            data = r.json()
+            if data.get("status") == "ok" and data.get("session"):
+                sess = data["session"]
+                print(f"   FlareSolverr-session oprettet ({str(sess)[:8]}…)")
+                return sess
+        except Exception as e:
+            print(f"   Kunne ikke oprette FlareSolverr-session: {e}")
+        return None
+
+    def _destroy(self, sess):
+        try:
+            requests.post(FLARESOLVERR_URL, json={"cmd": "sessions.destroy", "session": sess}, timeout=30)
         except Exception:
             pass
-        _FS_SESSION = None
 
+    def _alive(self, sess):
+        """Sundhedstjek: findes sessionen stadig i FlareSolverr?"""
+        try:
+            r = requests.post(FLARESOLVERR_URL, json={"cmd": "sessions.list"}, timeout=30)
+            return sess in (r.json().get("sessions") or [])
+        except Exception:
+            return False
+
+    def warm(self, n=None):
+        """Opret sessioner på forhånd, så der er n (standard: hele puljen). De
+        startes samtidigt, da hver er en browser-start. Returnerer antal nye."""
+        with self._cond:
+            if self._closed:
+                return 0
+            count = max(0, min(n or self.size, self.size) - self._created)
+            self._created += count
+
+        def create():
+            sess = self._create()
+            if sess is None:
+                self._forget()
+            else:
+                self._release(sess)
+
+        threads = [threading.Thread(target=create, daemon=True) for _ in range(count)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return count
+
+    def _acquire(self):
+        while True:
+            with self._cond:
+                while True:
+                    if self._closed:
+                        return None
+                    if self._idle:
+                        sess, last_used = self._idle.pop()
+                        break
+                    if self._created < self.size:
+                        self._created += 1
+                        sess = None
+                        break
+                    # Alle sessioner er udlånt - vent på at en bliver ledig eller kasseret
+                    self._cond.wait()
+
+            if sess is None:
+                sess = self._create()
+                if sess is None:
+                    self._forget()
+                return sess
+
+            if time.monotonic() - last_used < FS_HEALTH_CHECK_AFTER or self._alive(sess):
+                return sess
+            print(f"   FlareSolverr-session {str(sess)[:8]}… svarer ikke - erstatter den")
+            self._discard(sess)
+
+    def _forget(self):
+        # En plads i puljen er blevet fri - en ventende tråd kan oprette en ny session
+        with self._cond:
+            self._created -= 1
+            self._cond.notify()
 
-atexit.register(_destroy_session)
+    def _discard(self, sess):
+        self._destroy(sess)
+        self._forget()
+
+    def _release(self, sess):
+        with self._cond:
+            if not self._closed:
+                self._idle.append((sess, time.monotonic()))
+                self._cond.notify()
+                return
+        # Puljen blev lukket mens sessionen var udlånt
+        self._discard(sess)
+
+    @contextlib.contextmanager
+    def lease(self):
+        """Lån en session. Giver None hvis ingen kunne oprettes (hent så uden session).
+        Fejler blokken, destrueres sessionen og erstattes ved næste lån."""
+        sess = self._acquire()
+        try:
+            yield sess
+        except BaseException:
+            if sess is not None:
+                self._discard(sess)
+            raise
+        else:
+            if sess is not None:
+                self._release(sess)
+
+    def close(self):
+        """Destruer ledige sessioner nu; udlånte destrueres når de gives tilbage."""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+        for sess, _ in idle:
+            self._discard(sess)
+
+
+_FS_POOL = _SessionPool(FS_POOL_SIZE)
+atexit.register(_FS_POOL.close)
+
+
+def warm_sessions(n=None):
+    """Start FlareSolverr-sessionerne før en serie samtidige hentninger, så de
+    første sider ikke hver venter på en browser-start. Gør intet uden
+    FLARESOLVERR_URL, eller når FlareSolverr er sat på pause (circuit breaker)."""
+    if FLARESOLVERR_URL and BREAKERS.closed(TIER_FLARESOLVERR):
+        _FS_POOL.warm(n)
+
+
+class _FlareSolverrError(Exception):
+    """FlareSolverr svarede, men kunne ikke løse siden (fx timeout i browseren)."""
 
 
 def _via_flaresolverr(url):
     """Hent via FlareSolverr (rigtig browser der løser Cloudflare). (html, status).
-    Genbruger en session, så udfordringen kun løses én gang."""
+    Låner en session fra puljen, så udfordringen kun løses én gang pr. session."""
     payload = {"cmd": "request.get", "url": url, "maxTimeout": MAX_TIMEOUT_MS}
-    sess = _ensure_session()
-    if sess:
-        payload["session"] = sess
-    r = requests.post(FLARESOLVERR_URL, json=payload, timeout=MAX_TIMEOUT_MS / 1000 + 30)
-    data = r.json()
-    if data.get("status") == "ok":
-        sol = data.get("solution", {})
-        return sol.get("response"), sol.get("status", 200)
-    print(f"   FlareSolverr: {data.get('message', 'ukendt fejl')}")
-    return None, None
+    try:
+        with _FS_POOL.lease() as sess:
+            if sess:
+                payload["session"] = sess
+            r = requests.post(FLARESOLVERR_URL, json=payload, timeout=MAX_TIMEOUT_MS / 1000 + 30)
+            data = r.json()
+            if data.get("status") != "ok":
+                raise _FlareSolverrError(data.get("message", "ukendt fejl"))
+    except _FlareSolverrError as e:
+        print(f"   FlareSolverr: {e}")
+        return None, None
+    sol = data.get("solution", {})
+    _CLEARANCE.remember(url, sol)
+    return sol.get("response"), sol.get("status", 200)
+
+
+# Cookie-overlevering: FlareSolverr sender cf_clearance-cookies og browserens
+# User-Agent med i hvert svar. Med dem kan efterfølgende sider fra samme vært
+# hentes med almindelig requests (under et sekund) i stedet for via browseren.
+# Dukker udfordringen op igen, glemmes cookies og vi falder tilbage til FlareSolverr.
+# SCRAPER_COOKIE_REUSE=0 slår det fra.
+COOKIE_REUSE = os.environ.get("SCRAPER_COOKIE_REUSE", "1").strip() != "0"
+
+_CHALLENGE_MARKERS = (
+    "cf-chl-", "challenge-platform", "<title>Just a moment", "cf_chl_opt",
+)
+
+
+def _is_challenge(status, headers, text):
+    if headers.get("cf-mitigated") == "challenge":
+        return True
+    if status in (403, 429, 503):
+        return True
+    head = text[:20000]
+    return any(m in head for m in _CHALLENGE_MARKERS)
+
+
+class _ClearanceStore:
+    """requests.Session pr. vært med de cookies og den UA FlareSolverr løste med."""
+
+    def __init__(self):
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def remember(self, url, solution):
+        if not COOKIE_REUSE:
+            return
+        cookies = solution.get("cookies") or []
+        ua = solution.get("userAgent")
+        if not ua or not any(c.get("name") == "cf_clearance" for c in cookies):
+            return
+        host = urllib.parse.urlsplit(url).hostname
+        with self._lock:
+            sess = self._sessions.get(host)
+            first = sess is None
+            if first:
+                sess = self._sessions[host] = self._new_session()
+            # Samme session opdateres, så tråde der er midt i et kald med den ikke rammes
+            sess.headers["User-Agent"] = ua
+            for c in cookies:
+                sess.cookies.set(c["name"], c["value"], domain=c.get("domain", host), path=c.get("path", "/"))
+        if first:
+            print(f"   🍪 Cloudflare-cookies fra FlareSolverr genbruges for {host}")
+
+    @staticmethod
+    def _new_session():
+        sess = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(4, FS_POOL_SIZE * 2))
+        sess.mount("https://", adapter)
+        sess.mount("http://", adapter)
+        return sess
+
+    def has(self, url):
+        with self._lock:
+            return urllib.parse.urlsplit(url).hostname in self._sessions
+
+    def forget(self, url, sess):
+        """Glem værtens session - men kun hvis det stadig er `sess`, den der fejlede.
+        Den lukkes ikke, da andre tråde kan være midt i et kald med den."""
+        host = urllib.parse.urlsplit(url).hostname
+        with self._lock:
+            if self._sessions.get(host) is not sess:
+                return
+            del self._sessions[host]
+        print(f"   🍪 Cloudflare-udfordring igen på {host} - tilbage til FlareSolverr")
+
+    def get(self, url, timeout):
+        """Hent med de gemte cookies. (html, status); html er None ved udfordring."""
+        with self._lock:
+            sess = self._sessions.get(urllib.parse.urlsplit(url).hostname)
+        if sess is None:
+            return None, None
+        try:
+            r = sess.get(url, timeout=timeout)
+        except Exception:
+            self.forget(url, sess)
+            raise
+        if _is_challenge(r.status_code, r.headers, r.text):
+            self.forget(url, sess)
+            return None, r.status_code
+        return r.text, r.status_code
+
+    def close(self):
+        with self._lock:
+            sessions, self._sessions = list(self._sessions.values()), {}
+        for sess in sessions:
+            sess.close()
+
+
+_CLEARANCE = _ClearanceStore()
+atexit.register(_CLEARANCE.close)
 
 
 def _via_api(url, timeout):
@@ -110,58 +370,317 @@ def _via_api(url, timeout):
     return None, r.status_code
 
 
-def fetch(url, max_retries=2, timeout=30):
+def fetch(url, max_retries=2, timeout=30, use_cache=True):
     """Hent en URL robust. Returnerer (html_text, status_code).
     html_text er None hvis alt fejlede.
 
+    Er disk-cachen slået til (SCRAPER_CACHE_DIR, se http_cache.py), svares der
+    fra den så længe siden ikke er udløbet; nye vellykkede svar gemmes i den.
+
     Rækkefølge:
+      - Har FlareSolverr allerede løst Cloudflare for værten: almindelig HTTP
+        med de samme cookies (falder igennem hvis udfordringen er tilbage).
       - Hvis FlareSolverr er konfigureret: brug den PRIMÆRT (cloudscraper er
         alligevel blokeret af Cloudflare, så det sparer tid at gå direkte hertil).
       - Ellers / hvis FlareSolverr fejler: cloudscraper.
       - Til sidst: valgfri betalt API (kun hvis nøgle er sat).
     """
+    rec = METRICS.start(url)
+    cache = CACHE if use_cache else None
+    if cache is not None:
+        cached = cache.get(url)
+        if cached is not None:
+            print("   🗄️  hentet fra cache")
+            METRICS.finish(rec, cached[0], cached[1], served_by="cache")
+            return cached
+    html, status = _run_plan(_fetch_plan(url, max_retries, timeout), rec)
+    METRICS.finish(rec, html, status)
+    if cache is not None and html is not None and status == 200:
+        cache.put(url, html, status)
+    return html, status
+
+
+def _fetch_plan(url, max_retries, timeout):
+    """Selve strategien (FlareSolverr → cloudscraper → betalt API) som en generator.
+
+    Den udfører ikke selv netværkskald eller pauser, men yielder trin:
+      ("call", funktion, argumenter)  -> får funktionens resultat tilbage
+                                         (eller dens exception kastet ind)
+      ("sleep", sekunder)             -> ventetid fra den fælles rate-begrænser
+      ("wait", funktion, argumenter)  -> som "call", men et blokerende vent (på en
+                                         breakers prøveforsøg), der tælles som ventetid
+      ("run", funktion, argumenter)   -> som "call", men forberedelse (fx at importere
+                                         og oprette cloudscraper), ikke et forsøg
+      ("tier", navn)                  -> hvilken metode de næste kald hører til
+                                         (bruges til målingerne i fetch_metrics)
+    og returnerer til sidst (html, status). Så kan både den blokerende fetch()
+    og den asynkrone fetch_async() bruge præcis samme rækkefølge og regler.
+    """
     last_status = None
 
+    # 0) Hurtig vej: almindelig HTTP med cookies fra en tidligere FlareSolverr-løsning
+    if _CLEARANCE.has(url):
+        yield ("tier", TIER_CLEARANCE)
+        try:
+            yield ("sleep", LIMITER.reserve(url))
+            html, status = yield ("call", _CLEARANCE.get, (url, timeout))
+            LIMITER.record(url, status)
+            if html is not None:
+                print("   ✅ hentet med genbrugte FlareSolverr-cookies")
+                return html, status
+        except Exception as e:
+            print(f"   genbrugte cookies fejlede: {e}")  # _CLEARANCE.get har glemt sessionen
+
     # 1) FlareSolverr som primær (rigtig browser der omgår Cloudflare)
-    if FLARESOLVERR_URL:
-        for attempt in range(1, 3):
-            try:
-                html, status = _via_flaresolverr(url)
-                if html is not None:
-                    print("   ✅ hentet via FlareSolverr")
-                    return html, status or 200
-                print(f"   FlareSolverr gav intet (forsøg {attempt}/2)")
-            except Exception as e:
-                print(f"   FlareSolverr fejl (forsøg {attempt}/2): {e}")
-            time.sleep(random.uniform(2, 5))
+    allowed, probe = (yield from _enter_tier(TIER_FLARESOLVERR)) if FLARESOLVERR_URL else (False, False)
+    if allowed:
+        yield ("tier", TIER_FLARESOLVERR)
+        attempts = 1 if probe else 2
+        try:
+            for attempt in range(1, attempts + 1):
+                try:
+                    yield ("sleep", LIMITER.reserve(url))
+                    html, status = yield ("call", _via_flaresolverr, (url,))
+                    LIMITER.record(url, status)
+                    if html is not None:
+                        BREAKERS.success(TIER_FLARESOLVERR)
+                        print("   ✅ hentet via FlareSolverr")
+                        return html, status or 200
+                    print(f"   FlareSolverr gav intet (forsøg {attempt}/{attempts})")
+                except Exception as e:
+                    print(f"   FlareSolverr fejl (forsøg {attempt}/{attempts}): {e}")
+                BREAKERS.failure(TIER_FLARESOLVERR)
+                if not BREAKERS.allow(TIER_FLARESOLVERR):
+                    break
+        finally:
+            if probe:
+                BREAKERS.release(TIER_FLARESOLVERR)
         print("   → FlareSolverr fejlede, prøver cloudscraper...")
 
     # 2) cloudscraper (primær hvis ingen FlareSolverr, ellers backup)
-    scraper = _new_scraper()
-    for attempt in range(1, max_retries + 1):
+    allowed, probe = yield from _enter_tier(TIER_CLOUDSCRAPER)
+    if allowed:
+        yield ("tier", TIER_CLOUDSCRAPER)
+        retries = 1 if probe else max_retries
         try:
-            time.sleep(random.uniform(1.5, 3))
-            r = scraper.get(url, timeout=timeout)
-            last_status = r.status_code
-            if r.status_code == 200:
-                return r.text, 200
-            print(f"   cloudscraper HTTP {r.status_code} (forsøg {attempt}/{max_retries})")
-        except Exception as e:
-            print(f"   cloudscraper fejl (forsøg {attempt}/{max_retries}): {e}")
-        if attempt < max_retries:
-            time.sleep(random.uniform(8, 15))
-            scraper = _new_scraper()
+            scraper = yield ("run", _new_scraper, ())
+            for attempt in range(1, retries + 1):
+                try:
+                    yield ("sleep", LIMITER.reserve(url))
+                    r = yield ("call", scraper.get, (url,), {"timeout": timeout})
+                    last_status = r.status_code
+                    LIMITER.record(url, r.status_code)
+                    if not _looks_blocked(r.status_code):
+                        BREAKERS.success(TIER_CLOUDSCRAPER)
+                    if r.status_code == 200:
+                        return r.text, 200
+                    print(f"   cloudscraper HTTP {r.status_code} (forsøg {attempt}/{retries})")
+                    if not _looks_blocked(r.status_code):
+                        break  # fx 404 - et nyt forsøg giver samme svar
+                except Exception as e:
+                    print(f"   cloudscraper fejl (forsøg {attempt}/{retries}): {e}")
+                BREAKERS.failure(TIER_CLOUDSCRAPER)
+                if not BREAKERS.allow(TIER_CLOUDSCRAPER):
+                    break
+                if attempt < retries:
+                    scraper = yield ("run", _new_scraper, ())
+        finally:
+            if probe:
+                BREAKERS.release(TIER_CLOUDSCRAPER)
+    else:
+        print("   → cloudscraper springes over (blokeret for nylig)")
 
     # 3) Valgfri betalt API (kun hvis nøgle er sat)
-    if SCRAPER_API_KEY:
+    allowed, probe = (yield from _enter_tier(TIER_API)) if SCRAPER_API_KEY else (False, False)
+    if allowed:
+        yield ("tier", TIER_API)
         try:
             print("   → prøver via betalt scraping-API...")
-            html, status = _via_api(url, timeout)
+            html, status = yield ("call", _via_api, (url, timeout))
             if html is not None:
+                BREAKERS.success(TIER_API)
                 print("   ✅ hentet via scraping-API")
                 return html, 200
             last_status = status
+            if _looks_blocked(status):
+                BREAKERS.failure(TIER_API)
+            else:
+                BREAKERS.success(TIER_API)
         except Exception as e:
             print(f"   scraping-API fejl: {e}")
+            BREAKERS.failure(TIER_API)
+        finally:
+            if probe:
+                BREAKERS.release(TIER_API)
 
     return None, last_status
+
+
+def _enter_tier(tier):
+    """(må bruges, er prøveforsøget) for metoden. Kører et prøveforsøg (half-open)
+    for den lige nu, ventes der på resultatet i stedet for at springe den over."""
+    allowed, probe = BREAKERS.enter(tier)
+    if not allowed and BREAKERS.probe_running(tier):
+        print(f"   🔌 venter på prøveforsøget for {tier}...")
+        allowed, probe = yield ("wait", BREAKERS.wait_probe, (tier,))
+    return allowed, probe
+
+
+def _looks_blocked(status):
+    """Svar der tyder på at metoden er blokeret/nede (og ikke at siden bare mangler)."""
+    return status is None or status in (403, 429) or status >= 500
+
+
+def _run_plan(plan, rec):
+    """Udfør en _fetch_plan blokerende (time.sleep og almindelige kald).
+    Ventetid og forsøg registreres i rec (en fetch_metrics.CallRecord)."""
+    try:
+        step = next(plan)
+        while True:
+            if step[0] == "tier":
+                rec.tier = step[1]
+                step = plan.send(None)
+                continue
+            if step[0] == "sleep":
+                if step[1] > 0:
+                    time.sleep(step[1])
+                    rec.sleep(step[1])
+                step = plan.send(None)
+                continue
+            func, args = step[1], step[2]
+            kwargs = step[3] if len(step) > 3 else {}
+            t0 = time.perf_counter()
+            if step[0] != "call":
+                # "wait"/"run": ikke et forsøg på at hente siden
+                try:
+                    result = func(*args, **kwargs)
+                except Exception as e:
+                    step = plan.throw(e)
+                    continue
+                if step[0] == "wait":
+                    rec.sleep(time.perf_counter() - t0)
+                step = plan.send(result)
+                continue
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                rec.attempt(time.perf_counter() - t0)
+                step = plan.throw(e)
+            else:
+                rec.attempt(time.perf_counter() - t0)
+                step = plan.send(result)
+    except StopIteration as stop:
+        return stop.value
+    finally:
+        plan.close()  # afbrudt midt i: frigiv fx et breaker-prøveforsøg
+
+
+# =============================================================================
+# Asynkron variant
+# =============================================================================
+
+# Højst så mange samtidige hentninger pr. værtsnavn i fetch_async/fetch_many
+HOST_CONCURRENCY = max(1, int(os.environ.get("SCRAPER_HOST_CONCURRENCY", "4")))
+
+# (event loop, værtsnavn) -> semafor. Svage værdier: en semafor holder sit loop i live
+# (Semaphore._loop), så med loopet som nøgle ville intet loop nogensinde blive ryddet op.
+# En semafor der er i brug, holdes i live af de tasks der venter på eller har den.
+_host_semaphores = weakref.WeakValueDictionary()
+_host_semaphores_lock = threading.Lock()
+
+
+def _host_semaphore(url):
+    """Én semafor pr. (event loop, værtsnavn)."""
+    import asyncio
+    key = (id(asyncio.get_running_loop()), urllib.parse.urlsplit(url).hostname)
+    with _host_semaphores_lock:
+        sem = _host_semaphores.get(key)
+        if sem is None:
+            sem = _host_semaphores[key] = asyncio.Semaphore(HOST_CONCURRENCY)
+    return sem
+
+
+async def _run_plan_async(plan, rec):
+    """Udfør en _fetch_plan i event loopet: netværkskald i tråde, pauser med asyncio.sleep."""
+    import asyncio
+    try:
+        step = next(plan)
+        while True:
+            if step[0] == "tier":
+                rec.tier = step[1]
+                step = plan.send(None)
+                continue
+            if step[0] == "sleep":
+                if step[1] > 0:
+                    await asyncio.sleep(step[1])
+                    rec.sleep(step[1])
+                step = plan.send(None)
+                continue
+            func, args = step[1], step[2]
+            kwargs = step[3] if len(step) > 3 else {}
+            t0 = time.perf_counter()
+            if step[0] != "call":
+                # "wait"/"run": ikke et forsøg på at hente siden
+                try:
+                    result = await asyncio.to_thread(func, *args, **kwargs)
+                except Exception as e:
+                    step = plan.throw(e)
+                    continue
+                if step[0] == "wait":
+                    rec.sleep(time.perf_counter() - t0)
+                step = plan.send(result)
+                continue
+            try:
+                result = await asyncio.to_thread(func, *args, **kwargs)
+            except Exception as e:
+                rec.attempt(time.perf_counter() - t0)
+                step = plan.throw(e)
+            else:
+                rec.attempt(time.perf_counter() - t0)
+                step = plan.send(result)
+    except StopIteration as stop:
+        return stop.value
+    finally:
+        plan.close()  # fx annulleret af fetch_many: frigiv et breaker-prøveforsøg
+
+
+async def fetch_async(url, max_retries=2, timeout=30, use_cache=True):
+    """Asynkron udgave af fetch(): samme rækkefølge af metoder og samme returværdi
+    (html_text, status_code), men ventetid blokerer ikke event loopet, og der
+    hentes højst HOST_CONCURRENCY sider ad gangen fra samme vært."""
+    import asyncio  # kun de asynkrone kaldere betaler for at importere asyncio
+    rec = METRICS.start(url)
+    cache = CACHE if use_cache else None
+    if cache is not None:
+        cached = await asyncio.to_thread(cache.get, url)
+        if cached is not None:
+            print("   🗄️  hentet fra cache")
+            METRICS.finish(rec, cached[0], cached[1], served_by="cache")
+            return cached
+    async with _host_semaphore(url):
+        html, status = await _run_plan_async(_fetch_plan(url, max_retries, timeout), rec)
+    METRICS.finish(rec, html, status)
+    if cache is not None and html is not None and status == 200:
+        await asyncio.to_thread(cache.put, url, html, status)
+    return html, status
+
+
+async def fetch_many(urls, **kwargs):
+    """Hent flere URL'er samtidigt og giv (url, html, status) efterhånden som de
+    bliver færdige (ikke nødvendigvis i samme rækkefølge som urls).
+
+        async for url, html, status in fetch_many(urls):
+            ...
+    """
+    import asyncio
+    async def one(u):
+        html, status = await fetch_async(u, **kwargs)
+        return u, html, status
+
+    tasks = [asyncio.ensure_future(one(u)) for u in urls]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for t in tasks:
+            t.cancel()
@@ -0,0 +1,154 @@
+"""
+Skriv kun de celler i Google Sheets der faktisk har ændret sig.
+
+Scriptene har allerede hele arket i hukommelsen (sheet.get_all_values()), så de
+nye værdier sammenlignes med det, og kun ændrede celler sendes - samlet i så få
+sammenhængende ranges som muligt (samme rækker i nabokolonner bliver ét
+rektangel, fx 'B7:C9'). På en stille dag sendes næsten intet.
+
+Er ændringerne spredt ud over mange rækker (fx når halvdelen af rytterne har
+fået nye point), ville det give hundredvis af små ranges. Så skrives i stedet
+én sammenhængende kolonneblok pr. gruppe af kolonner (fx 'B2:C181'), med
+værdierne i rækkefølge; uændrede celler i blokken får deres nuværende værdi.
+Grænsen er SHEETS_MAX_RANGES (standard 20) ranges.
+
+Rækker og kolonner er 1-baserede som i arket (række 1 er overskriften).
+
+    cells = changed_cells(all_values, {(2, 2): 120, (3, 2): 0})
+    updates = plan_writes(all_values, cells)  # [{'range': 'B2:B3', 'values': [[120], [0]]}]
+    sheet.batch_update(updates)
+"""
+
+import os
+
+MAX_RANGES = max(1, int(os.environ.get("SHEETS_MAX_RANGES", "20")))
+
+
+def column_letter(col):
+    """1 -> 'A', 27 -> 'AA'."""
+    letters = ""
+    while col > 0:
+        col, rest = divmod(col - 1, 26)
+        letters = chr(ord("A") + rest) + letters
+    return letters
+
+
+def cell_value(snapshot, row, col):
+    """Cellens tekst i get_all_values()-snapshottet ('' hvis den ikke findes)."""
+    if row - 1 < len(snapshot):
+        values = snapshot[row - 1]
+        if col - 1 < len(values):
+            return values[col - 1]
+    return ""
+
+
+def _as_text(value):
+    # get_all_values() giver altid tekst; tal og None sammenlignes som de vises
+    return "" if value is None else str(value)
+
+
+def changed_cells(snapshot, values):
+    """De (række, kolonne) -> værdi fra `values` der afviger fra snapshottet."""
+    return {cell: value for cell, value in values.items()
+            if _as_text(value) != cell_value(snapshot, *cell)}
+
+
+def coalesce_ranges(cells):
+    """{(række, kolonne): værdi} -> batch_update-ranges med færrest mulige rektangler.
+
+    Først samles hver række i vandrette stykker af nabokolonner; derefter lægges
+    rækker under hinanden sammen, når de har præcis samme stykke."""
+    spans = []  # (første kolonne, sidste kolonne, række, værdier)
+    by_row = {}
+    for (row, col), value in cells.items():
+        by_row.setdefault(row, {})[col] = value
+    for row in sorted(by_row):
+        cols = sorted(by_row[row])
+        start = prev = cols[0]
+        for col in cols[1:] + [None]:
+            if col is not None and col == prev + 1:
+                prev = col
+                continue
+            spans.append((start, prev, row, [by_row[row][c] for c in range(start, prev + 1)]))
+            if col is not None:
+                start = prev = col
+
+    blocks = {}  # (første kolonne, sidste kolonne) -> [[første række, sidste række, rækker]]
+    for first_col, last_col, row, values in spans:
+        runs = blocks.setdefault((first_col, last_col), [])
+        if runs and runs[-1][1] == row - 1:
+            runs[-1][1] = row
+            runs[-1][2].append(values)
+        else:
+            runs.append([row, row, [values]])
+
+    updates = []
+    for (first_col, last_col), runs in blocks.items():
+        for first_row, last_row, values in runs:
+            start = f"{column_letter(first_col)}{first_row}"
+            end = f"{column_letter(last_col)}{last_row}"
+            updates.append({"range": start if start == end else f"{start}:{end}",
+                            "values": values})
+    updates.sort(key=lambda u: _range_sort_key(u["range"]))
+    return updates
+
+
+def column_blocks(snapshot, cells, wanted=None):
+    """Én range pr. gruppe af nabokolonner, fra første til sidste ændrede række.
+    Celler i blokken uden ændring får værdien fra `wanted` eller snapshottet."""
+    wanted = wanted or {}
+    rows = [row for row, _ in cells]
+    first_row, last_row = min(rows), max(rows)
+    cols = sorted({col for _, col in cells})
+    groups = [[cols[0]]]
+    for col in cols[1:]:
+        if col == groups[-1][-1] + 1:
+            groups[-1].append(col)
+        else:
+            groups.append([col])
+
+    updates = []
+    for group in groups:
+        values = []
+        for row in range(first_row, last_row + 1):
+            line = []
+            for col in group:
+                cell = (row, col)
+                if cell in cells:
+                    line.append(cells[cell])
+                elif cell in wanted:
+                    line.append(wanted[cell])
+                else:
+                    line.append(cell_value(snapshot, row, col))
+            values.append(line)
+        start = f"{column_letter(group[0])}{first_row}"
+        end = f"{column_letter(group[-1])}{last_row}"
+        updates.append({"range": start if start == end else f"{start}:{end}",
+                        "values": values})
+    return updates
+
+
+def plan_writes(snapshot, cells, wanted=None, max_ranges=MAX_RANGES):
+    """Få, sammenhængende ranges for de ændrede celler: rektangler hvis der er
+    få nok, ellers kolonneblokke (se modulbeskrivelsen)."""
+    if not cells:
+        return []
+    ranges = coalesce_ranges(cells)
+    if len(ranges) <= max_ranges:
+        return ranges
+    return column_blocks(snapshot, cells, wanted)
+
+
+def _range_sort_key(a1):
+    start = a1.split(":", 1)[0]
+    letters = start.rstrip("0123456789")
+    return int(start[len(letters):]), len(letters), letters
+
+
+def count_cells(updates):
+    return sum(len(row) for u in updates for row in u["values"])
+
+
+def report(changed, unchanged, updates):
+    print(f"📝 {changed} ændrede celler, {unchanged} uændrede - sendt som "
+          f"{count_cells(updates)} celler i {len(updates)} ranges")
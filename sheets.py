@@ -0,0 +1,241 @@
+"""
+Fælles Google Sheets-forbindelse for de daglige jobs.
+
+Før loggede hvert script ind for sig og åbnede regnearket med
+client.open(SHEET_NAME), som er en søgning i Google Drive. Her logges der ind
+én gang pr. proces, regnearket åbnes direkte på nøglen (samme som
+GOOGLE_SHEET_ID i frontend/src/App.js), og faneblade huskes. Alle kald går
+gennem den samme HTTP-session (gspreads AuthorizedSession), så forbindelsen
+genbruges. Kører jobbene i samme proces (daily_update.py), betales login og
+forbindelse kun én gang pr. kørsel.
+
+    from sheets import worksheet
+    sheet = worksheet('Points')
+
+Skrivninger går gennem en fælles kø (WRITES):
+
+    write(sheet, updates)       # [{'range': 'B2:C3', 'values': [...]}, ...]
+    clear(sheet)
+
+Uden for `with batched():` sendes de med det samme. Inden for samles alle
+skrivninger til samme regneark - også fra forskellige faneblade og jobs - og
+sendes ved slutningen som ét values_batch_update-kald (plus ét
+values_batch_clear, hvis noget skal ryddes først). Svarer Google 429 eller 5xx,
+prøves igen med eksponentiel ventetid og tilfældig spredning (SHEETS_MAX_RETRIES,
+standard 5 genforsøg). Køen tæller selv skrive-kald pr. minut og venter hellere
+end at ramme kvoten (SHEETS_WRITE_QUOTA, standard 60 pr. minut).
+"""
+
+import os
+import time
+import random
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+CREDENTIALS_FILE = os.environ.get("GOOGLE_CREDENTIALS_FILE",
+                                  "cycling-fantasy-485220-faab21c57cd1.json")
+SHEET_KEY = os.environ.get("GOOGLE_SHEET_KEY", "1RfoTiYhMI-Yr7123evM4_PeSYn87W20UCBerhqV_Ztg")
+SCOPE = ['https://spreadsheets.google.com/feeds',
+         'https://www.googleapis.com/auth/drive']
+
+MAX_RETRIES = max(0, int(os.environ.get("SHEETS_MAX_RETRIES", "5")))
+WRITE_QUOTA = max(1, int(os.environ.get("SHEETS_WRITE_QUOTA", "60")))  # skrive-kald pr. minut
+MAX_BACKOFF = 64.0
+QUOTA_WINDOW = 60.0
+
+_lock = threading.RLock()
+_client = None
+_spreadsheet = None
+_worksheets = {}
+
+
+def client():
+    """gspread-klienten (logger ind første gang)."""
+    global _client
+    with _lock:
+        if _client is None:
+            # Tunge imports hentes først her (se bench_startup.py)
+            import gspread
+            from oauth2client.service_account import ServiceAccountCredentials
+
+            creds = ServiceAccountCredentials.from_json_keyfile_name(CREDENTIALS_FILE, SCOPE)
+            _client = gspread.authorize(creds)
+        return _client
+
+
+def spreadsheet():
+    """Regnearket, åbnet på nøglen (ingen Drive-søgning)."""
+    global _spreadsheet
+    with _lock:
+        if _spreadsheet is None:
+            _spreadsheet = client().open_by_key(SHEET_KEY)
+        return _spreadsheet
+
+
+def worksheet(title, rows=None, cols=None):
+    """Fanebladet `title`. Findes det ikke, oprettes det hvis rows/cols er givet,
+    ellers rejses gspreads WorksheetNotFound."""
+    with _lock:
+        if title not in _worksheets:
+            import gspread
+            try:
+                _worksheets[title] = spreadsheet().worksheet(title)
+            except gspread.exceptions.WorksheetNotFound:
+                if rows is None:
+                    raise
+                _worksheets[title] = spreadsheet().add_worksheet(title=title, rows=rows, cols=cols or 26)
+        return _worksheets[title]
+
+
+def use(book):
+    """Brug et andet regneark-objekt (fx fake_sheets.FakeSpreadsheet) i stedet for
+    at logge ind hos Google."""
+    global _spreadsheet
+    with _lock:
+        reset()
+        _spreadsheet = book
+
+
+def reset():
+    """Glem forbindelse og faneblade (fx efter en fejl, så næste kald logger ind igen)."""
+    global _client, _spreadsheet
+    with _lock:
+        _client = None
+        _spreadsheet = None
+        _worksheets.clear()
+
+
+# =============================================================================
+# Skrive-kø
+# =============================================================================
+
+def _retryable(error):
+    status = getattr(getattr(error, "response", None), "status_code", None)
+    return status == 429 or (status is not None and status >= 500)
+
+
+def _sheet_range(title, a1=None):
+    quoted = "'{}'".format(title.replace("'", "''"))
+    return f"{quoted}!{a1}" if a1 else quoted
+
+
+class WriteQueue:
+    """Samler skrivninger pr. regneark og sender dem med retry og kvote-styring."""
+
+    def __init__(self, max_retries=MAX_RETRIES, quota=WRITE_QUOTA, sleep=time.sleep,
+                 clock=time.monotonic):
+        self.max_retries = max_retries
+        self.quota = quota
+        self.sleep = sleep
+        self.clock = clock
+        self.deferred = 0          # > 0 inden for batched()
+        self.requests = 0          # sendte skrive-kald
+        self.retries = 0
+        self.queued_ranges = 0
+        self._recent = deque()     # tidspunkter for skrive-kald inden for kvote-vinduet
+        self._pending = {}         # id(regneark) -> [regneark, clears, data]
+        self._lock = threading.RLock()
+
+    def write(self, sheet, updates):
+        """Skriv ranges i fanebladet `sheet`. Returnerer False hvis det fejlede."""
+        data = [{"range": _sheet_range(sheet.title, u["range"]), "values": u["values"]}
+                for u in updates]
+        return self._add(sheet.spreadsheet, [], data)
+
+    def clear(self, sheet):
+        """Ryd fanebladet (før eventuelle nye værdier i samme flush)."""
+        return self._add(sheet.spreadsheet, [_sheet_range(sheet.title)], [])
+
+    def _add(self, book, clears, data):
+        with self._lock:
+            entry = self._pending.setdefault(id(book), [book, [], []])
+            entry[1].extend(clears)
+            entry[2].extend(data)
+            self.queued_ranges += len(data)
+            if self.deferred:
+                return True
+        return self.flush()
+
+    def flush(self):
+        """Send alt i køen. Returnerer False hvis noget ikke kunne skrives."""
+        with self._lock:
+            pending, self._pending = list(self._pending.values()), {}
+        ok = True
+        for book, clears, data in pending:
+            try:
+                if clears:
+                    self._send(book.values_batch_clear, {"ranges": clears})
+                if data:
+                    self._send(book.values_batch_update, {"valueInputOption": "RAW", "data": data})
+            except Exception as e:
+                print(f"❌ Kunne ikke skrive til Google Sheets: {e}")
+                ok = False
+        return ok
+
+    def _send(self, call, body):
+        attempt = 0
+        while True:
+            self._reserve()
+            try:
+                return call(body=body)
+            except Exception as e:
+                if not _retryable(e) or attempt >= self.max_retries:
+                    raise
+                delay = min(MAX_BACKOFF, 2 ** attempt) + random.random()
+                attempt += 1
+                self.retries += 1
+                print(f"   ⏳ Google Sheets svarede {e.response.status_code} - prøver igen om "
+                      f"{delay:.1f}s ({attempt}/{self.max_retries})")
+                self.sleep(delay)
+
+    def _reserve(self):
+        # Vent hellere selv end at få 429, når kvoten for det sidste minut er brugt
+        with self._lock:
+            now = self.clock()
+            while self._recent and now - self._recent[0] >= QUOTA_WINDOW:
+                self._recent.popleft()
+            if len(self._recent) >= self.quota:
+                wait = QUOTA_WINDOW - (now - self._recent[0]) + 1.0  # lidt margen til Googles ur
+                print(f"   ⏳ Skrive-kvoten ({self.quota}/min) er brugt - venter {wait:.1f}s")
+                self.sleep(wait)
+                self._recent.popleft()
+            self._recent.append(self.clock())
+            self.requests += 1
+
+    def used_last_minute(self):
+        with self._lock:
+            now = self.clock()
+            return sum(1 for t in self._recent if now - t < QUOTA_WINDOW)
+
+
+WRITES = WriteQueue()
+
+
+def write(sheet, updates):
+    return WRITES.write(sheet, updates)
+
+
+def clear(sheet):
+    return WRITES.clear(sheet)
+
+
+@contextmanager
+def batched():
+    """Saml alle skrivninger i blokken og send dem samlet til sidst.
+    Resultatet af flush gemmes i .ok på det objekt der gives med `as`."""
+    result = _BatchResult()
+    with WRITES._lock:
+        WRITES.deferred += 1
+    try:
+        yield result
+    finally:
+        with WRITES._lock:
+            WRITES.deferred -= 1
+            last = WRITES.deferred == 0
+        if last:
+            result.ok = WRITES.flush()
+
+
+class _BatchResult:
+    ok = True
@@ -5,42 +5,240 @@ FULDT AUTOMATISK UCI POINT OPDATERING - KOMPLET VERSION
 - Batch updates til Google Sheets (ingen rate limit problemer)
 """
 
-import cloudscraper
-from bs4 import BeautifulSoup
-import pandas as pd
-import time
-import random
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
+import os
+import sys
+import multiprocessing
 from datetime import datetime
+from typing import NamedTuple
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 
-from scraper_utils import fetch  # FlareSolverr (primær) + cloudscraper (backup)
+from scraper_utils import fetch, warm_sessions  # FlareSolverr (primær) + cloudscraper (backup)
+from html_parsing import STREAM_PARSER, has_table, iter_table_rows, make_soup
+from page_fingerprints import PageRowCache  # spring parsing over for uændrede sider
+from name_index import NameIndex  # navneopslag uden lineære gennemløb
+from rider_names import rider_key  # fælles navnenøgle (også brugt af frontenden)
+from rider_aliases import ALIASES  # manuelle og gennemsete navne-aliaser
+import sheets  # fælles login + regneark åbnet på nøglen
+from sheet_writes import changed_cells, plan_writes, report as report_writes
 
 # =============================================================================
 # KONFIGURATION
 # =============================================================================
 
-CREDENTIALS_FILE = 'cycling-fantasy-485220-faab21c57cd1.json'
-SHEET_NAME = 'Cycling Fantasy 2026'
 WORKSHEET_NAME = 'Points'
+POINTS_COLUMN = 2  # B: point
+DATE_COLUMN = 3    # C: dato for sidste ændring
+
+RANKING_URL = ("https://www.procyclingstats.com/rankings.php?p=uci-season-individual&s=&date={date}"
+               "&nation=&age=&page=smallerorequal&team=&offset={offset}&teamlevel=&filter=Filter")
+MAX_PAGES = 20
+PAGE_SIZE = 100
+
+# Antal ranking-sider der må hentes samtidig. 1 = den gamle sekventielle gennemgang.
+# Sæt PCS_MAX_INFLIGHT_PAGES=1 for at slå parallel hentning fra.
+MAX_INFLIGHT_PAGES = max(1, int(os.environ.get("PCS_MAX_INFLIGHT_PAGES", "4")))
+
+# Antal processer der parser ranking-sider, mens de næste sider hentes (0 = parse i
+# hente-trådene). Målt med `python fake_flaresolverr.py --bench-parse` betaler det sig
+# ikke for en ranking på 1500-2000 ryttere - heller ikke med lxml/html.parser - da det
+# koster mere at starte processerne og sende siderne over end selve parsingen.
+PARSE_WORKERS = max(0, int(os.environ.get("PCS_PARSE_WORKERS", "0")))
+
+# Parser til ranking-siderne: "stream" (uden DOM, standard), "lxml" eller "html.parser"
+RANKING_PARSER = os.environ.get("PCS_RANKING_PARSER", STREAM_PARSER).strip() or STREAM_PARSER
+
+# Parsede rækker gemt pr. side-aftryk, så uændrede sider ikke parses igen (tom = slået fra)
+PAGE_CACHE_FILE = os.environ.get("PCS_PAGE_CACHE", ".cache/ranking_pages.json").strip()
 
 # =============================================================================
 # FUNKTIONER
 # =============================================================================
 
-def scrape_uci_ranking():
-    """Hent UCI Ranking med cloudscraper"""
+
+class RankingRow(NamedTuple):
+    """Én rytter i rankingen - bygget direkte af parseren."""
+    rank: int
+    rider: str
+    team: str
+    points: int
+
+
+# Kolonner i PCS' ranking-tabel: #, Prev, Diff, Rider, Team, Points
+RIDER_COL = 3
+TEAM_COL = 4
+POINTS_COL = 5
+
+
+def _parse_points(text):
+    """'1,234' / '12.5' / '80' -> int. ValueError hvis det ikke er et tal."""
+    text = text.strip().replace(',', '')
+    return int(float(text)) if '.' in text else int(text)
+
+
+def _to_ranking_row(cells):
+    """Celletekster -> RankingRow, eller None hvis rækken ikke er en rytter med point."""
+    rider = cells[RIDER_COL].strip() if len(cells) > RIDER_COL else cells[0].strip()
+    if not rider or rider in ('Rider', 'nan'):
+        return None
+    try:
+        points = _parse_points(cells[POINTS_COL] if len(cells) > POINTS_COL else cells[-1])
+    except ValueError:
+        return None
+    rank = cells[0].strip()
+    team = cells[TEAM_COL].strip() if len(cells) > POINTS_COL else ''
+    return RankingRow(int(rank) if rank.isdigit() else 0, rider, team, points)
+
+
+def _parse_ranking_page(html, parser=None):
+    """Udtræk ranking-rækker (RankingRow) fra én side. Returnerer None hvis siden ikke har en tabel.
+
+    Standard er den strømmende udtrækker (RANKING_PARSER), der kun læser første
+    tabel; med parser='html.parser'/'lxml' bruges BeautifulSoup som før."""
+    parser = parser or RANKING_PARSER
+    if parser == STREAM_PARSER:
+        if not has_table(html):
+            return None
+        rows = iter_table_rows(html)
+    else:
+        soup = make_soup(html, parser)
+        table = soup.find('table')
+
+        if not table:
+            return None
+
+        rows = ([cell.get_text(' ', strip=True) for cell in cells]
+                for cells in (row.find_all(['td', 'th']) for row in table.find_all('tr'))
+                if cells)
+
+    data_rows = []
+
+    for row_data in rows:
+        if len(row_data) >= 4:
+            if any(cell.strip().isdigit() for cell in row_data[:1]) or \
+               any('.' in cell or cell.replace('.', '').isdigit() for cell in row_data[-1:]):
+                record = _to_ranking_row(row_data)
+                if record is not None:
+                    data_rows.append(record)
+    return data_rows
+
+
+def _fetch_page(url, parse):
+    """Hent og parse én side. Returnerer (hentet, rækker, status, fejl), så fejl
+    kan håndteres i sideorden af kalderen. rækker er None hvis siden ikke har en tabel."""
+    try:
+        html, status = fetch(url)
+        if html is None:
+            return False, None, status, None
+        return True, parse(html), status, None
+    except Exception as e:
+        return False, None, None, e
+
+
+def _iter_ranking_pages(today, max_inflight, parse):
+    """Giv (side_nr, hentet, rækker, status, fejl) i offset-rækkefølge.
+
+    Med max_inflight > 1 er det en pipeline: op til max_inflight sider er
+    undervejs ad gangen (hentes og parses så snart de er hentet), mens kalderen
+    tager resultaterne i sideorden. Vinduet giver modtryk, så hukommelsen er
+    begrænset uanset hvor hurtigt siderne kommer. Når kalderen stopper
+    (kort/tom side), annulleres de sider der endnu ikke er startet.
+    """
+    urls = [RANKING_URL.format(date=today, offset=i * PAGE_SIZE) for i in range(MAX_PAGES)]
+
+    if max_inflight <= 1:
+        for page_num, url in enumerate(urls, start=1):
+            yield (page_num, *_fetch_page(url, parse))
+        return
+
+    pool = ThreadPoolExecutor(max_workers=max_inflight)
+    pending = deque()
+    next_index = 0
+    try:
+        for page_num in range(1, len(urls) + 1):
+            while next_index < len(urls) and len(pending) < max_inflight:
+                pending.append(pool.submit(_fetch_page, urls[next_index], parse))
+                next_index += 1
+            fetched, rows, status, error = pending.popleft().result()
+            if isinstance(rows, Future):
+                # Parses i procespuljen (se _submit_parse) - vent først her
+                try:
+                    rows = rows.result()
+                except Exception as e:
+                    rows, error = None, e
+            yield (page_num, fetched, rows, status, error)
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _submit_parse(parse_pool, page_cache, html):
+    """Send siden til parse-processerne og returnér en Future, så hente-tråden
+    kan hente næste side imens. Uændrede sider (page_cache) parses ikke.
+    Parseren gives med, da processerne ikke ser en RANKING_PARSER sat efter start."""
+    fp, rows = page_cache.lookup(html)
+    if rows is not None:
+        return rows
+    future = parse_pool.submit(_parse_ranking_page, html, RANKING_PARSER)
+
+    def remember(done):
+        if not done.cancelled() and done.exception() is None:
+            page_cache.store(fp, done.result())
+
+    future.add_done_callback(remember)
+    return future
+
+
+def _start_parse_pool(max_inflight, parse_workers):
+    """Procespulje til parsing, så CPU-arbejdet ikke deler tråd (og GIL) med
+    hentningen. None = parse direkte i hente-tråden.
+
+    Processerne startes her, før hente-trådene, og via forkserver hvor den findes:
+    fork fra en proces med kørende tråde (hente-tråde, FlareSolverr-puljen) kan
+    arve låse der er taget, og hænge."""
+    if max_inflight <= 1 or parse_workers <= 0:
+        return None
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("forkserver" if "forkserver" in methods else None)
+    try:
+        pool = ProcessPoolExecutor(max_workers=parse_workers, mp_context=context)
+        pool.submit(os.getpid).result()
+        return pool
+    except (OSError, NotImplementedError, BrokenProcessPool) as e:
+        print(f"   Kunne ikke starte parse-processer ({e}) - parser i hente-trådene")
+        return None
+
+
+def scrape_uci_ranking(max_inflight=None, parse_workers=None):
+    """Hent UCI Ranking med cloudscraper.
+
+    max_inflight: antal sider der hentes samtidig (standard MAX_INFLIGHT_PAGES).
+    parse_workers: antal processer der parser siderne mens de næste hentes
+                   (standard PARSE_WORKERS; 0 = parse i hente-trådene).
+    Returnerer en liste af RankingRow i rankingens rækkefølge (samme resultat
+    som ved sekventiel hentning), eller None hvis intet kunne hentes.
+    """
+    if max_inflight is None:
+        max_inflight = MAX_INFLIGHT_PAGES
+    if parse_workers is None:
+        parse_workers = PARSE_WORKERS
+
     print("\n" + "=" * 70)
     print("🚴 Henter UCI Season Ranking med CloudScraper")
     print("=" * 70)
     
     # Hentning sker via scraper_utils.fetch (cloudscraper + scraping-API fallback)
     all_data = []
-    offset = 0
-    page_num = 1
-    MAX_PAGES = 20
-    
-    print(f"🔄 Starter scraping...")
+    page_cache = PageRowCache(PAGE_CACHE_FILE, row_factory=lambda r: RankingRow(*r),
+                              version="RankingRow")
+    parse_pool = _start_parse_pool(max_inflight, parse_workers)
+    warm_sessions(max_inflight)  # én browser-session pr. side der hentes samtidig
+    if parse_pool is None:
+        parse = lambda html: page_cache.rows_for(html, _parse_ranking_page)
+    else:
+        parse = lambda html: _submit_parse(parse_pool, page_cache, html)
+    
+    print(f"🔄 Starter scraping ({max_inflight} sider ad gangen)...")
     print("-" * 70)
     
     # Brug dagens dato for at få aktuelle season points
@@ -48,37 +246,22 @@ def scrape_uci_ranking():
     print(f"📅 Henter data for dato: {today}")
     print("-" * 70)
     
-    while page_num <= MAX_PAGES:
-        url = f"https://www.procyclingstats.com/rankings.php?p=uci-season-individual&s=&date={today}&nation=&age=&page=smallerorequal&team=&offset={offset}&teamlevel=&filter=Filter"
-        
+    pages = _iter_ranking_pages(today, max_inflight, parse)
+    for page_num, fetched, data_rows, status, error in pages:
         print(f"📥 Side {page_num}: ", end="", flush=True)
         
         try:
-            html, status = fetch(url)
+            if error is not None:
+                raise error
 
-            if html is None:
+            if not fetched:
                 print(f"HTTP {status} - stopper (cloudscraper + fallback fejlede)")
                 break
-
-            soup = BeautifulSoup(html, 'html.parser')
-            table = soup.find('table')
             
-            if not table:
+            if data_rows is None:
                 print("Ingen tabel - stopper")
                 break
             
-            rows = table.find_all('tr')
-            data_rows = []
-            
-            for row in rows:
-                cells = row.find_all(['td', 'th'])
-                if cells:
-                    row_data = [cell.get_text(' ', strip=True) for cell in cells]
-                    if len(row_data) >= 4:
-                        if any(cell.strip().isdigit() for cell in row_data[:1]) or \
-                           any('.' in cell or cell.replace('.', '').isdigit() for cell in row_data[-1:]):
-                            data_rows.append(row_data)
-            
             print(f"{len(data_rows)} ryttere ✅")
             
             if not data_rows or len(data_rows) < 5:
@@ -91,89 +274,83 @@ def scrape_uci_ranking():
             if len(data_rows) < 50:
                 break
             
-            offset += 100
-            page_num += 1
-            
         except Exception as e:
             print(f"Fejl: {e}")
             break
     
+    pages.close()
+    if parse_pool is not None:
+        parse_pool.shutdown(wait=False, cancel_futures=True)
     print("-" * 70)
+    if page_cache.reused:
+        print(f"♻️  {page_cache.reused}/{page_cache.reused + page_cache.parsed} sider uændrede - "
+              f"genbrugte tidligere parsede rækker")
+    page_cache.save()
     
     if not all_data:
         print("❌ Ingen data hentet")
         return None
     
-    df = pd.DataFrame(all_data)
-    
-    if len(df) > 0:
-        first_row_str = ' '.join(df.iloc[0].astype(str))
-        if any(kw in first_row_str for kw in ['#', 'Rider', 'Points']):
-            df.columns = df.iloc[0]
-            df = df[1:].reset_index(drop=True)
-    
-    df = df.dropna(how='all')
+    print(f"✅ Total: {len(all_data)} ryttere hentet\n")
     
-    print(f"✅ Total: {len(df)} ryttere hentet\n")
-    
-    return df
+    return all_data
+
+def points_map(rows):
+    """RankingRow-liste -> {rytternavn: point} i én gennemgang"""
+    print("🔄 Konverterer til point dictionary...")
+    points_dict = {row.rider: row.points for row in rows}
+    print(f"✅ {len(points_dict)} ryttere konverteret\n")
+    return points_dict
 
 def convert_to_points_dict(df):
-    """Konverter DataFrame til point dictionary"""
+    """Konverter DataFrame (fx fra et regneark) til point dictionary.
+    Den daglige kørsel bruger points_map på RankingRow-listen i stedet.
+
+    Vektoriseret: kolonnerne findes én gang, point-kolonnen renses med
+    pandas' strengfunktioner til en nullable heltalskolonne, og ugyldige rækker
+    (tomt navn, header, point der ikke er et tal) fjernes med masker. Antallet
+    af afviste rækker udskrives i stedet for at blive sprunget stille over."""
+    import numpy as np
+    import pandas as pd
+
     print("🔄 Konverterer til point dictionary...")
     
-    points_dict = {}
+    labels = [str(col).lower() for col in df.columns]
+    n_cols = len(labels)
+    rider_pos = next((i for i, col in enumerate(labels) if 'rider' in col), None)
+    points_pos = next((i for i, col in enumerate(labels) if 'point' in col), None)
     
-    rider_col = None
-    points_col = None
+    if rider_pos is None:
+        rider_pos = 3 if n_cols > 3 else 0
+    if points_pos is None:
+        points_pos = 5 if n_cols > 5 else n_cols - 1
     
-    for col in df.columns:
-        col_lower = str(col).lower()
-        if 'rider' in col_lower and rider_col is None:
-            rider_col = col
-        if 'point' in col_lower and points_col is None:
-            points_col = col
+    print(f"   Rider kolonne: {df.columns[rider_pos]}")
+    print(f"   Points kolonne: {df.columns[points_pos]}")
     
-    if rider_col is None:
-        rider_col = 3 if len(df.columns) > 3 else 0
-    if points_col is None:
-        points_col = 5 if len(df.columns) > 5 else -1
+    riders = df.iloc[:, rider_pos].astype(str).str.strip()
+    raw = df.iloc[:, points_pos].astype(str).str.strip().str.replace(',', '', regex=False)
     
-    print(f"   Rider kolonne: {rider_col}")
-    print(f"   Points kolonne: {points_col}")
+    # Som int(...) / int(float(...)) før: hele tal, eller decimaltal der skæres af
+    looks_numeric = raw.str.fullmatch(r'[+-]?\d+') | raw.str.contains('.', regex=False)
+    numeric = pd.to_numeric(raw.where(looks_numeric), errors='coerce')
+    points = pd.Series(np.trunc(numeric), index=df.index).astype('Int64')
     
-    for idx, row in df.iterrows():
-        try:
-            rider_name = str(row[rider_col]).strip()
-            points_str = str(row[points_col]).strip()
-            
-            if '.' in points_str:
-                points = int(float(points_str.replace(',', '')))
-            else:
-                points = int(points_str.replace(',', ''))
-            
-            if rider_name and rider_name not in ['', 'Rider', 'nan']:
-                points_dict[rider_name] = points
-                
-        except Exception as e:
-            continue
+    valid = points.notna() & riders.ne('') & ~riders.isin(['Rider', 'nan'])
     
-    print(f"✅ {len(points_dict)} ryttere konverteret\n")
+    # Ved dubletter vinder sidste forekomst (som før)
+    points_dict = dict(zip(riders[valid].tolist(), points[valid].tolist()))
+    
+    rejected = len(df) - int(valid.sum())
+    print(f"✅ {len(points_dict)} ryttere konverteret"
+          + (f" ({rejected} rækker afvist)" if rejected else "") + "\n")
     return points_dict
 
 def connect_to_sheets():
     """Forbind til Google Sheets"""
     print("📊 Forbinder til Google Sheets...")
-    scope = [
-        'https://spreadsheets.google.com/feeds',
-        'https://www.googleapis.com/auth/drive'
-    ]
     try:
-        creds = ServiceAccountCredentials.from_json_keyfile_name(
-            CREDENTIALS_FILE, scope
-        )
-        client = gspread.authorize(creds)
-        sheet = client.open(SHEET_NAME).worksheet(WORKSHEET_NAME)
+        sheet = sheets.worksheet(WORKSHEET_NAME)
         print("✅ Forbundet til Google Sheets!\n")
         return sheet
     except Exception as e:
@@ -181,36 +358,16 @@ def connect_to_sheets():
         return None
 
 def normalize_name(name):
-    """Normaliser rytternavn"""
-    return ' '.join(str(name).split()).upper()
+    """Normaliser rytternavn (samme nøgle som startlisten og frontenden, se rider_names.py)"""
+    return rider_key(name)
 
 def find_rider_points(rider_name, points_dict):
-    """Find point for rytter med fuzzy matching"""
-    if rider_name in points_dict:
-        return points_dict[rider_name]
-    
-    normalized = normalize_name(rider_name)
-    for rank_name, points in points_dict.items():
-        if normalize_name(rank_name) == normalized:
-            return points
-    
-    # Prøv at matche på forskellige navneformater
-    parts = normalized.split()
-    if len(parts) >= 2:
-        last_name = parts[-1]
-        first_name = parts[0]
-        
-        for rank_name, points in points_dict.items():
-            rank_parts = normalize_name(rank_name).split()
-            if len(rank_parts) >= 2:
-                # Match både fornavn og efternavn
-                if rank_parts[0] == first_name and rank_parts[-1] == last_name:
-                    return points
-                # Prøv omvendt rækkefølge (efternavn først)
-                if rank_parts[0] == last_name and rank_parts[-1] == first_name:
-                    return points
-    
-    return None
+    """Find point for rytter med fuzzy matching.
+    points_dict kan være en NameIndex (byg den én gang pr. kørsel) eller en dict.
+    Tilnærmet match (se name_index.py) prøves kun hvis de præcise regler fejler."""
+    if not isinstance(points_dict, NameIndex):
+        points_dict = NameIndex(points_dict, normalize_name)
+    return points_dict.get(rider_name, approximate=True)
 
 def update_google_sheet_batch(sheet, points_dict):
     """Opdater Google Sheet med BATCH update (undgår rate limits)"""
@@ -220,9 +377,10 @@ def update_google_sheet_batch(sheet, points_dict):
     all_values = sheet.get_all_values()
     today = datetime.now().strftime('%Y-%m-%d')
     
-    updates = []
+    wanted = {}
     updated = 0
     not_found = []
+    index = NameIndex(points_dict, normalize_name, aliases=ALIASES, target="points")
     
     for i, row in enumerate(all_values[1:], start=2):
         if not row or not row[0]:
@@ -231,37 +389,48 @@ def update_google_sheet_batch(sheet, points_dict):
         rider_name = row[0].strip()
         print(f"[{i-1}/{len(all_values)-1}] {rider_name:40s} ", end="", flush=True)
         
-        points = find_rider_points(rider_name, points_dict)
+        points = find_rider_points(rider_name, index)
         
         if points is not None:
             print(f"→ {points:4d} point ✅")
-            updates.append({
-                'range': f'B{i}:C{i}',
-                'values': [[points, today]]
-            })
-            updated += 1
         else:
             print(f"→ 0 point (ikke i ranking)")
-            updates.append({
-                'range': f'B{i}:C{i}',
-                'values': [[0, today]]
-            })
+            points = 0
             not_found.append(rider_name)
-            updated += 1
+        wanted[(i, POINTS_COLUMN)] = points
+        updated += 1
+    
+    # Kun ændrede point sendes; datoen skrives kun ud for dem (= sidst ændret)
+    changed = changed_cells(all_values, wanted)
+    for row, _ in list(changed):
+        changed[(row, DATE_COLUMN)] = today
+    updates = plan_writes(all_values, changed, wanted)
     
     print("=" * 70)
-    print(f"📝 Forbereder batch update af {len(updates)} ryttere...")
+    report_writes(len(changed), 2 * len(wanted) - len(changed), updates)
     
     if updates:
-        try:
-            sheet.batch_update(updates)
-            print(f"✅ Batch update succesfuld!\n")
-        except Exception as e:
-            print(f"❌ Batch update fejl: {e}\n")
+        # Via skrive-køen (retry ved 429/5xx; samles med de andre jobs i daily_update.py)
+        if not sheets.write(sheet, updates):
+            print("❌ Batch update fejl\n")
             return 0
+        print(f"✅ Batch update {'lagt i kø' if sheets.WRITES.deferred else 'succesfuld'}!\n")
+    else:
+        print("✅ Ingen ændringer - arket er allerede opdateret\n")
     
     print(f"✅ Opdateret: {updated}/{len(all_values)-1} ryttere\n")
     
+    if ALIASES.hits or ALIASES.proposed:
+        print(f"📚 Aliaser: {ALIASES.hits} brugt, {ALIASES.proposed} nye til gennemsyn "
+              f"({len(ALIASES)} bekræftede)\n")
+    
+    if index.approximate_hits:
+        print(f"🔎 {len(index.approximate_hits)} ryttere matchet tilnærmet - tjek dem "
+              f"(ret/bekræft i rider_aliases.json):")
+        for name, match, score in index.approximate_hits:
+            print(f"   - {name} ≈ {match} ({score:.0%})")
+        print()
+    
     if not_found:
         print(f"💡 {len(not_found)} ryttere ikke fundet (sat til 0):")
         for name in not_found[:10]:
@@ -273,7 +442,7 @@ def update_google_sheet_batch(sheet, points_dict):
     return updated
 
 def main():
-    """Main funktion"""
+    """Main funktion. Returnerer False hvis opdateringen ikke kunne gennemføres."""
     print("\n" + "=" * 70)
     print("🚴 CYCLING FANTASY - FULD AUTOMATISK OPDATERING")
     print("=" * 70)
@@ -281,16 +450,16 @@ def main():
     print("=" * 70)
     
     # 1. Scrape UCI ranking
-    df = scrape_uci_ranking()
-    if df is None or df.empty:
+    rows = scrape_uci_ranking()
+    if not rows:
         print("❌ Kunne ikke hente ranking. Afslutter.")
-        return
+        return False
     
     # 2. Konverter til dictionary
-    points_dict = convert_to_points_dict(df)
+    points_dict = points_map(rows)
     if not points_dict:
         print("❌ Kunne ikke konvertere data. Afslutter.")
-        return
+        return False
     
     # Vis top 10
     print("🏆 Top 10 i rankingen:")
@@ -303,7 +472,7 @@ def main():
     sheet = connect_to_sheets()
     if not sheet:
         print("❌ Kunne ikke forbinde til Google Sheets. Afslutter.")
-        return
+        return False
     
     # 4. Opdater Google Sheet (BATCH!)
     updated = update_google_sheet_batch(sheet, points_dict)
@@ -314,6 +483,7 @@ def main():
     print(f"⏰ Sluttid: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print("=" * 70)
     print()
+    return True
 
 if __name__ == "__main__":
-    main()
+    sys.exit(0 if main() else 1)